@@ -9,10 +9,20 @@ from shared.constants.directories import Directories
 from infrastructure.logging_setup import logger
 import time
 import json
+import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent / "src"))
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    def _json_loads(data: bytes):
+        return json.loads(data.decode("utf-8"))
+
 # Ahora podemos importar desde src
 
 
@@ -32,6 +42,75 @@ def create_cli_application():
     return main_loop
 
 
+@lru_cache(maxsize=4096)
+def _load_progress(path: str, mtime_ns: int) -> dict:
+    """
+    Carga un archivo progress.json, cacheado por ruta y fecha de modificación.
+
+    Args:
+        path: Ruta al archivo de progreso
+        mtime_ns: Fecha de modificación en nanosegundos (invalida la caché)
+
+    Returns:
+        dict: Contenido del archivo de progreso
+    """
+    with open(path, "rb") as f:
+        return _json_loads(f.read())
+
+
+def _cleanup_entry(entry: os.DirEntry, is_cache_dir: bool, current_time: float) -> None:
+    """
+    Limpia una entrada de un directorio temporal.
+
+    Args:
+        entry: Entrada obtenida con os.scandir (reutiliza su información de stat)
+        is_cache_dir: Si la entrada pertenece al directorio de caché
+        current_time: Marca de tiempo de referencia para la antigüedad
+    """
+    try:
+        if entry.is_dir():
+            item = Path(entry.path)
+
+            # Verificar si el directorio está vacío
+            with os.scandir(entry.path) as it:
+                is_empty = next(it, None) is None
+            if is_empty:
+                item.rmdir()
+                logger.info(f"Eliminado directorio vacío: {item}")
+                return
+
+            # Verificar archivos de progreso antiguos
+            progress_file = item / "progress.json"
+            if progress_file.exists():
+                stats = progress_file.stat()
+                # Si el archivo tiene más de 24 horas sin modificarse
+                if current_time - stats.st_mtime > 86400:
+                    progress_data = _load_progress(
+                        str(progress_file), stats.st_mtime_ns)
+                    # Si el proceso no está en progreso o tiene error
+                    if progress_data.get("status") in ["error", "completed", None]:
+                        progress_file.unlink()
+                        logger.info(
+                            f"Eliminado archivo de progreso antiguo: {progress_file}")
+
+            # Verificar archivos de validación huérfanos
+            validation_file = item / "validation.json"
+            if validation_file.exists() and not (item / "document.pdf").exists():
+                validation_file.unlink()
+                logger.info(
+                    f"Eliminado archivo de validación huérfano: {validation_file}")
+
+        elif is_cache_dir and entry.is_file():
+            # Eliminar archivos de caché antiguos (más de 7 días)
+            if current_time - entry.stat().st_mtime > 604800:
+                os.unlink(entry.path)
+                logger.info(
+                    f"Eliminado archivo de caché antiguo: {entry.path}")
+
+    except Exception as e:
+        logger.error(f"Error procesando {entry.path}: {e}")
+
+
 def cleanup_temp_files():
     """
     Limpia archivos temporales y directorios vacíos usando directorios centralizados.
@@ -40,6 +119,9 @@ def cleanup_temp_files():
     - Elimina archivos de validación huérfanos
     - Elimina directorios vacíos
     - Limpia archivos de caché antiguos
+
+    Las entradas se listan con os.scandir y se procesan en un pool de hilos,
+    ya que el coste está en las llamadas al sistema de archivos.
     """
     try:
         from src.shared.constants.directories import UPLOAD_DIR, CACHE_DIR
@@ -51,54 +133,23 @@ def cleanup_temp_files():
             Path("output")
         ]
 
-        for base_dir in dirs_to_check:
-            if not base_dir.exists():
-                continue
-
-            # Tiempo actual
-            current_time = time.time()
-
-            # Revisar cada subdirectorio
-            for item in base_dir.iterdir():
-                try:
-                    if item.is_dir():
-                        # Verificar si el directorio está vacío
-                        files = list(item.iterdir())
-                        if not files:
-                            item.rmdir()
-                            logger.info(f"Eliminado directorio vacío: {item}")
-                            continue
-
-                        # Verificar archivos de progreso antiguos
-                        progress_file = item / "progress.json"
-                        if progress_file.exists():
-                            stats = progress_file.stat()
-                            # Si el archivo tiene más de 24 horas sin modificarse
-                            if current_time - stats.st_mtime > 86400:
-                                with open(progress_file) as f:
-                                    progress_data = json.load(f)
-                                    # Si el proceso no está en progreso o tiene error
-                                    if progress_data.get("status") in ["error", "completed", None]:
-                                        progress_file.unlink()
-                                        logger.info(
-                                            f"Eliminado archivo de progreso antiguo: {progress_file}")
-
-                        # Verificar archivos de validación huérfanos
-                        validation_file = item / "validation.json"
-                        if validation_file.exists() and not (item / "document.pdf").exists():
-                            validation_file.unlink()
-                            logger.info(
-                                f"Eliminado archivo de validación huérfano: {validation_file}")
-
-                    elif item.is_file() and base_dir.name == "cache":
-                        # Eliminar archivos de caché antiguos (más de 7 días)
-                        if current_time - item.stat().st_mtime > 604800:
-                            item.unlink()
-                            logger.info(
-                                f"Eliminado archivo de caché antiguo: {item}")
-
-                except Exception as e:
-                    logger.error(f"Error procesando {item}: {e}")
+        with ThreadPoolExecutor() as executor:
+            for base_dir in dirs_to_check:
+                if not base_dir.exists():
+                    continue
+
+                # Tiempo actual
+                current_time = time.time()
+
+                # Revisar cada entrada del directorio
+                with os.scandir(base_dir) as it:
+                    entries = list(it)
+
+                is_cache_dir = base_dir.name == "cache"
+                list(executor.map(
+                    lambda entry: _cleanup_entry(
+                        entry, is_cache_dir, current_time),
+                    entries))
 
     except Exception as e:
         logger.error(f"Error en limpieza de archivos temporales: {e}")
@@ -10,8 +10,7 @@ from .document_processing import (
     extract_markdown,
     perform_ocr_on_page,
     needs_ocr,
-    TableDetector,
-    run_parallel_ocr
+    TableDetector
 )
 from .llm_services import LLMRefiner
 from .language_services import (
@@ -28,7 +27,6 @@ __all__ = [
     'extract_markdown',           # Función principal para extraer Markdown de PDFs
     'perform_ocr_on_page',        # Función para OCR en una página
     'needs_ocr',                  # Función para determinar si una página necesita OCR
-    'run_parallel_ocr',           # Función para ejecutar OCR en paralelo
     'LLMRefiner',                 # Clase para refinamiento de texto con LLMs
     'TableDetector',              # Detector de tablas en imágenes
     # Detectores de idiomas
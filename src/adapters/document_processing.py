@@ -11,6 +11,8 @@ Este módulo contiene todas las implementaciones relacionadas con el procesamien
 from __future__ import annotations
 import io
 import os
+from functools import partial
+from itertools import chain
 from pathlib import Path
 from typing import List, Tuple, Dict
 from concurrent.futures import ProcessPoolExecutor
@@ -19,26 +21,34 @@ from dataclasses import dataclass
 # Dependencias externas
 try:
     import fitz  # PyMuPDF
+    _FITZ_AVAILABLE = True
 except ImportError:
     fitz = None
+    _FITZ_AVAILABLE = False
 import cv2
 import numpy as np
-from PIL import Image
 from loguru import logger
 
 # Imports internos
-from shared.util.config import config, AppConfig
+from shared.util.config import config
+from shared.utils.error_handling import ConfigurationError, ErrorContext
 from .ocr import *  # Importamos del módulo OCR refactorizado
-from .llm_services import LLMRefiner
 
-# Instancia de configuración
-app_config = AppConfig()
+# Instancia de configuración compartida
+app_config = config
 
 # Alias para compatibilidad con código anterior
 perform_ocr_on_page = extract_text_from_pdf
 
 # ===== Detector de Tablas =====
 
+# Longitud mínima (en píxeles) de una línea de tabla
+TABLE_MIN_LINE_LENGTH = 100
+_TABLE_HORIZONTAL_KERNEL = cv2.getStructuringElement(
+    cv2.MORPH_RECT, (TABLE_MIN_LINE_LENGTH, 1))
+_TABLE_VERTICAL_KERNEL = cv2.getStructuringElement(
+    cv2.MORPH_RECT, (1, TABLE_MIN_LINE_LENGTH))
+
 
 @dataclass
 class TableValidationResult:
@@ -55,31 +65,42 @@ class TableDetector:
 
     def __init__(self):
         self.min_confidence = 0.7
+        # Desviación estándar mínima de grises para buscar líneas: una región
+        # uniforme (en blanco o casi) no puede contener una tabla
+        self.min_contrast = 8.0
+        # Buffer reutilizable para la imagen binarizada
+        self._binary_buf = None
 
     def validate_table_structure(self, region: np.ndarray) -> TableValidationResult:
         """Valida la estructura de una tabla candidata."""
-        # Detectar líneas
-        gray = cv2.cvtColor(region, cv2.COLOR_RGB2GRAY)
-        edges = cv2.Canny(gray, 50, 150, apertureSize=3)
-        lines = cv2.HoughLinesP(edges, 1, np.pi/180, 100,
-                                minLineLength=100, maxLineGap=10)
+        # Reutilizar la región si ya viene en escala de grises
+        if region.ndim == 2:
+            gray = region
+        else:
+            gray = cv2.cvtColor(region, cv2.COLOR_RGB2GRAY)
 
-        if lines is None:
+        # Descartar regiones sin contraste antes de buscar líneas
+        if gray.std() < self.min_contrast:
             return TableValidationResult(False, 0.0, 0, 0)
 
-        # Separar líneas horizontales y verticales
-        h_lines = []
-        v_lines = []
-        for line in lines:
-            x1, y1, x2, y2 = line[0]
-            if abs(y2 - y1) < 10:  # horizontal
-                h_lines.append((min(x1, x2), max(x1, x2), y1))
-            elif abs(x2 - x1) < 10:  # vertical
-                v_lines.append((x1, min(y1, y2), max(y1, y2)))
-
-        # Calcular filas y columnas
-        num_rows = len(set(l[2] for l in h_lines))
-        num_cols = len(set(l[0] for l in v_lines))
+        # Binarizar (Otsu, invertida) en el buffer reutilizable
+        if self._binary_buf is None or self._binary_buf.shape != gray.shape:
+            self._binary_buf = np.empty(gray.shape, dtype=np.uint8)
+        cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU,
+                      dst=self._binary_buf)
+
+        # Las aperturas con elementos lineales conservan solo los trazos
+        # horizontales o verticales de al menos TABLE_MIN_LINE_LENGTH píxeles
+        horizontal = cv2.morphologyEx(self._binary_buf, cv2.MORPH_OPEN,
+                                      _TABLE_HORIZONTAL_KERNEL)
+        vertical = cv2.morphologyEx(self._binary_buf, cv2.MORPH_OPEN,
+                                    _TABLE_VERTICAL_KERNEL)
+
+        # Cada componente conexo es una línea (se descuenta el fondo)
+        num_rows = cv2.connectedComponents(horizontal)[0] - 1
+        num_cols = cv2.connectedComponents(vertical)[0] - 1
+        if num_rows == 0 and num_cols == 0:
+            return TableValidationResult(False, 0.0, 0, 0)
 
         # Calcular confianza
         min_expected = 2  # mínimo 2 filas y 2 columnas
@@ -96,64 +117,73 @@ class TableDetector:
 
 # ===== Funciones de OCR =====
 
-def needs_ocr(page, threshold=10):
+# Mínimo de caracteres extraíbles para considerar que una página no necesita OCR
+OCR_TEXT_THRESHOLD = 10
+
+
+def needs_ocr(page, threshold=OCR_TEXT_THRESHOLD, text=None):
     """
     Determina si una página requiere OCR basado en la cantidad de texto extraíble.
 
     Args:
         page: Página de PyMuPDF
         threshold: Umbral mínimo de caracteres para considerar que no necesita OCR
+        text: Texto ya extraído de la página (evita volver a extraerlo)
 
     Returns:
         bool: True si necesita OCR, False si no
     """
-    text = page.get_text().strip()
-    return len(text) < threshold
+    if text is None:
+        text = page.get_text()
+    return len(text.strip()) < threshold
 
 
-def _ocr_single(args: tuple[str, int]) -> str:
-    """
-    Función auxiliar para procesamiento en paralelo.
-    Ejecuta OCR en una sola página de un PDF.
-    """
-    pdf_path, page_idx = args
-    with fitz.open(pdf_path) as doc:
-        page = doc.load_page(page_idx)
-        return perform_ocr_on_page(page)
+# ===== Extracción de Markdown =====
 
+# Páginas a partir de las cuales extract_markdown reparte el documento
+# entre varios procesos
+PARALLEL_MIN_PAGES = 3
+# Procesos de extracción por defecto: más allá de unos pocos la apertura del
+# documento en cada proceso deja de compensar
+MAX_EXTRACTION_WORKERS = 4
 
-def run_parallel_ocr(pdf_path: Path) -> list[str]:
-    """
-    Ejecuta OCR en paralelo para todas las páginas de un PDF.
 
-    Args:
-        pdf_path: Ruta al archivo PDF
+def _page_blocks(n_pages: int, n_blocks: int) -> List[Tuple[int, int]]:
+    """Divide n_pages en n_blocks rangos contiguos [inicio, fin) de tamaño similar."""
+    return [(i * n_pages // n_blocks, (i + 1) * n_pages // n_blocks)
+            for i in range(n_blocks)]
 
-    Returns:
-        list[str]: Texto OCR por página, en orden
+
+def _extract_page_block(pdf_path: str, start: int, end: int) -> List[str]:
     """
-    from loguru import logger
-    import multiprocessing as mp
+    Extrae el texto seleccionable de las páginas [start, end) de un PDF.
 
+    Se ejecuta en los procesos del pool de extract_markdown: cada uno abre
+    el documento una sola vez para todo su bloque de páginas.
+    """
     with fitz.open(pdf_path) as doc:
-        n_pages = len(doc)
-        logger.info(f"Procesando {n_pages} páginas en paralelo")
-
-        # Para evitar problemas en Windows, usar spawn
-        ctx = mp.get_context('spawn')
-
-        # Crear pool con máximo de cores físicos - 1 (para no bloquear)
-        n_cores = max(1, os.cpu_count() or 2 - 1)
-        logger.debug(f"Usando {n_cores} cores para OCR")
+        return [doc.load_page(page_idx).get_text()
+                for page_idx in range(start, end)]
 
-        tasks = [(str(pdf_path.absolute()), i) for i in range(n_pages)]
-        with ProcessPoolExecutor(max_workers=n_cores, mp_context=ctx) as executor:
-            results = list(executor.map(_ocr_single, tasks))
 
-    return results
+def _ocr_pages(pdf_path: Path, pages: List[str], page_indices: List[int]) -> None:
+    """
+    Sustituye en pages el texto de las páginas indicadas por su OCR.
 
+    Las páginas se rasterizan una sola vez en este proceso y se reconocen en
+    el pool de perform_ocr_on_pages; el refinamiento LLM queda para después.
+    """
+    logger.info(f"Aplicando OCR a {len(page_indices)} páginas")
+    # Núcleos disponibles - 1 (para no bloquear), salvo que OCR_CONCURRENCY
+    # fije el límite explícitamente
+    n_workers = config.ocr.concurrency or max(1, (os.cpu_count() or 2) - 1)
+    with fitz.open(pdf_path) as doc:
+        texts = perform_ocr_on_pages(
+            [doc.load_page(page_idx) for page_idx in page_indices],
+            max_workers=n_workers, refine=False)
+    for page_idx, text in zip(page_indices, texts):
+        pages[page_idx] = text
 
-# ===== Extracción de Markdown =====
 
 def extract_markdown(pdf_path: Path, use_ocr: bool = True) -> str:
     """
@@ -166,9 +196,11 @@ def extract_markdown(pdf_path: Path, use_ocr: bool = True) -> str:
     Returns:
         str: Contenido del PDF en formato Markdown
     """
-    if not fitz:
-        raise ImportError("PyMuPDF (fitz) no está instalado. "
-                          "Instálalo con: pip install pymupdf")
+    if not _FITZ_AVAILABLE:
+        raise ConfigurationError(
+            "PyMuPDF (fitz) no está instalado. Instálalo con: pip install pymupdf",
+            context=ErrorContext(operation="extract_markdown",
+                                 file_path=str(pdf_path)))
 
     logger.info(f"Extrayendo contenido de {pdf_path}")
 
@@ -178,47 +210,55 @@ def extract_markdown(pdf_path: Path, use_ocr: bool = True) -> str:
         return f"Error: El archivo {pdf_path} no existe"
 
     try:
-        # Inicializar el refinador de LLM si está configurado
-        llm_refiner = None
-        if config.get("USE_LLM_REFINER", False):
-            llm_refiner = LLMRefiner()
+        with fitz.open(pdf_path) as doc:
+            n_pages = len(doc)
+
+        n_workers = 1
+        if n_pages >= PARALLEL_MIN_PAGES:
+            n_workers = min(config.ocr.concurrency or
+                            min(os.cpu_count() or 1, MAX_EXTRACTION_WORKERS), n_pages)
+
+        if n_workers > 1:
+            # PyMuPDF no libera el GIL al extraer texto: el documento se
+            # reparte en bloques de páginas contiguas entre procesos
+            logger.info(
+                f"Procesando {n_pages} páginas en paralelo ({n_workers} procesos)")
+            with ProcessPoolExecutor(max_workers=n_workers,
+                                     mp_context=process_pool_context()) as executor:
+                blocks = executor.map(
+                    partial(_extract_page_block, str(pdf_path)),
+                    *zip(*_page_blocks(n_pages, n_workers)))
+                pages = list(chain.from_iterable(blocks))
+        else:
+            pages = _extract_page_block(str(pdf_path), 0, n_pages)
 
-        # Procesar el PDF con o sin OCR
+        # Las páginas sin texto suficiente se reconocen con OCR
+        ocr_indices = []
         if use_ocr:
-            # Para PDFs grandes, procesamos en paralelo
-            if pdf_path.stat().st_size > 5 * 1024 * 1024:  # 5MB
-                logger.info(
-                    f"PDF grande detectado, usando procesamiento paralelo")
-                text_pages = run_parallel_ocr(pdf_path)
-                result = "\n\n".join(text_pages)
-            else:
-                # Abrir el PDF
-                doc = fitz.open(pdf_path)
-                result = []
-
-                for page_num in range(len(doc)):
-                    page = doc[page_num]
-                    page_text = page.get_text().strip()
-
-                    # Si no hay suficiente texto, aplicar OCR
-                    if needs_ocr(page):
-                        logger.info(f"Aplicando OCR a la página {page_num+1}")
-                        page_text = perform_ocr_on_page(page)
-
-                    result.append(page_text)
-
-                doc.close()
-                result = "\n\n".join(result)
-        else:
-            # Extracción simple sin OCR
-            doc = fitz.open(pdf_path)
-            result = "\n\n".join([page.get_text() for page in doc])
-            doc.close()
-
-        # Refinar con LLM si está disponible
-        if llm_refiner:
-            logger.info("Refinando texto con LLM")
-            result = llm_refiner.refine(result)
+            pages = [text.strip() for text in pages]
+            ocr_indices = [page_idx for page_idx, text in enumerate(pages)
+                           if len(text) < OCR_TEXT_THRESHOLD]
+            if ocr_indices:
+                _ocr_pages(pdf_path, pages, ocr_indices)
+
+        # Refinar con LLM página a página: las páginas se envían en
+        # peticiones concurrentes que comparten el mismo prompt de sistema.
+        # Las correcciones de caracteres de OCR solo se aplican a las
+        # páginas reconocidas con OCR, no al texto digital
+        if config.llm.mode != "off":
+            from_ocr = [False] * len(pages)
+            for page_idx in ocr_indices:
+                from_ocr[page_idx] = True
+            pages = refine_pages_text(pages, from_ocr=from_ocr)
+
+        # Ensamblar el documento en un único búfer en lugar de unir la lista
+        buf = io.StringIO()
+        for page_idx, text in enumerate(pages):
+            if page_idx:
+                buf.write("\n\n")
+            buf.write(text)
+        del pages
+        result = buf.getvalue()
 
         return result
 
@@ -5,16 +5,25 @@ Este módulo contiene los adaptadores para detectar idiomas en textos,
 incluyendo tanto implementaciones básicas como avanzadas.
 """
 
+import importlib.util
 import re
 import os
+import threading
+from functools import lru_cache
 from pathlib import Path
+from types import MappingProxyType
 from typing import Dict, Optional, List, Tuple, Type
 
 # Importaciones de terceros
+import numpy as np
 from loguru import logger
 
 # Importaciones internas
-from shared.util.config import AppConfig
+from shared.constants.directories import Directories
+from shared.util.config import config as app_config
+
+# Tokenizador de palabras, compilado una sola vez
+_WORD_RE = re.compile(r'\b\w+\b', re.UNICODE)
 
 # Implementación de SimpleLanguageDetector para evitar dependencia externa
 
@@ -24,26 +33,30 @@ class SimpleLanguageDetector:
     Detector simple de idiomas basado en palabras clave.
 
     Esta es una implementación simplificada para evitar dependencias externas.
+    Como no analiza el texto, ``detect`` es una función constante asignada
+    en la instancia: no crea un método ligado ni consulta atributos por llamada.
     """
 
-    def __init__(self, config=None):
-        self.config = config or {}
-        self.default_language = self.config.get('default_language', 'es')
+    __slots__ = ('default_language', 'detect')
 
-    def detect(self, text):
-        """Detecta el idioma basándose en palabras clave comunes"""
+    def __init__(self, config=None):
+        language = (config or {}).get('default_language', 'es')
+        self.default_language = language
         # Por defecto devolvemos español
-        return self.default_language
+        self.detect = lambda text: language
 
-# Función para obtener la configuración
+    def detect_batch(self, texts):
+        """Detecta el idioma de varios textos"""
+        return [self.default_language] * len(texts)
 
+# Función para obtener la configuración
 
-def get_config():
-    return {'default_language': 'es'}
+# Configuración de detección (constante: se construye una sola vez)
+_DETECTION_CONFIG = MappingProxyType({'default_language': 'es'})
 
 
-# Instancia de configuración
-app_config = AppConfig()
+def get_config():
+    return _DETECTION_CONFIG
 
 
 # ===== Detector base de idiomas =====
@@ -60,6 +73,19 @@ class LanguageDetector:
     Por defecto, retorna español si no hay suficiente confianza.
     """
 
+    __slots__ = ('config', 'supported_languages', 'default_language',
+                 'common_words', 'markers', 'marker_weights', '_marker_patterns',
+                 '_languages', '_decisive_chars', '_scorers', '_detect_cached')
+
+    # Longitud del prefijo usado como clave de caché: el idioma de una
+    # página suele quedar determinado por sus primeros párrafos
+    cache_prefix_length = 512
+
+    # Apariciones de caracteres exclusivos de un idioma necesarias para
+    # decidirlo sin puntuar: una sola (un nombre propio como "A Coruña" o
+    # un glifo mal reconocido) no basta
+    decisive_min_hits = 3
+
     def __init__(self):
         """Inicializa el detector con la configuración por defecto."""
         self.config = get_config()
@@ -72,11 +98,66 @@ class LanguageDetector:
             "es": ["el", "la", "los", "las", "un", "una", "y", "en", "de", "que", "por", "con", "para"],
             "en": ["the", "and", "to", "of", "a", "in", "that", "it", "with", "for", "as", "on"]
         }
+        # Conjuntos inmutables para búsquedas por hash
+        self.common_words = {lang: frozenset(words)
+                             for lang, words in self.common_words.items()}
+
+        # Marcadores característicos de cada idioma y su peso en la puntuación
+        # (es: caracteres como ñ, ¿, ¡; en: contracciones como 's, 've, 'll)
+        self.markers = {
+            "es": ["á", "é", "í", "ó", "ú", "ü", "ñ", "¿", "¡"],
+            "en": ["'s", "'ve", "'ll", "'re"]
+        }
+        self.marker_weights = {"es": 0.3, "en": 0.2}
+
+        # Todos los marcadores de un idioma se buscan con una única expresión
+        # precompilada que se detiene en la primera coincidencia
+        self._marker_patterns = {
+            lang: re.compile("|".join(re.escape(m) for m in ms))
+            for lang, ms in self.markers.items() if ms}
+
+        # Orden fijo de idiomas evaluados: las puntuaciones se calculan como
+        # vectores alineados con esta tupla
+        self._languages = tuple(lang for lang in self.common_words
+                                if lang in self.supported_languages)
+
+        # Caracteres exclusivos de un idioma: si aparecen con frecuencia, el
+        # idioma queda decidido sin tokenizar ni puntuar (solo idiomas
+        # soportados)
+        self._decisive_chars = tuple(
+            (ch, lang) for ch, lang in (("ñ", "es"), ("¿", "es"), ("¡", "es"),
+                                        ("ß", "de"), ("œ", "fr"))
+            if lang in self._languages)
+
+        # Un puntuador especializado por idioma: sus palabras, marcadores y
+        # peso quedan fijados en el cierre en lugar de buscarse en diccionarios
+        self._scorers = tuple(self._build_scorer(lang)
+                              for lang in self._languages)
+
+        # Caché de resultados por prefijo de texto (propia de cada instancia)
+        self._detect_cached = lru_cache(maxsize=1024)(self.detect_language)
 
     def detect(self, text: str) -> str:
         """
         Detecta el idioma de un texto utilizando heurísticas simples.
 
+        El análisis se hace sobre el prefijo del texto y se cachea, de modo
+        que detectar repetidamente la misma página no vuelve a recorrerla.
+
+        Args:
+            text: Texto para analizar
+
+        Returns:
+            Código ISO del idioma detectado (por defecto 'es')
+        """
+        if not text:
+            return self.default_language
+        return self._detect_cached(text[:self.cache_prefix_length])
+
+    def detect_language(self, text: str) -> str:
+        """
+        Analiza el texto con heurísticas simples, sin caché.
+
         Args:
             text: Texto para analizar
 
@@ -86,45 +167,158 @@ class LanguageDetector:
         if not text or len(text.strip()) < self.config.get("text_min_length", 50):
             return self.default_language
 
+        if not self._languages:
+            return self.default_language
+
         text_lower = text.lower()
-        scores = {}
-
-        # 1. Buscar palabras comunes
-        for lang, words in self.common_words.items():
-            if lang not in self.supported_languages:
-                continue
-
-            # Calcular proporción de palabras encontradas
-            count = sum(1 for word in words if re.search(
-                r'\b' + re.escape(word) + r'\b', text_lower))
-            scores[lang] = count / len(words)
-
-        # 2. Caracteres especiales
-        if "es" in self.supported_languages:
-            # Más peso para español si hay caracteres como ñ, ¿, ¡, etc.
-            es_chars = sum(1 for c in text if c in "áéíóúüñ¿¡")
-            if es_chars > 0:
-                scores["es"] = scores.get("es", 0) + 0.3
-
-        # 3. Patrones gramaticales
-        if "en" in self.supported_languages:
-            # Patrones típicos ingleses (ej: 's, 've, 'll)
-            en_patterns = sum(1 for pattern in ["'s", "'ve", "'ll", "'re"]
-                              if pattern in text_lower)
-            if en_patterns > 0:
-                scores["en"] = scores.get("en", 0) + 0.2
 
-        # Determinar idioma basado en puntuación
-        if not scores:
-            return self.default_language
+        # Atajo: varios caracteres exclusivos deciden el idioma
+        hits = {}
+        for ch, lang in self._decisive_chars:
+            hits[lang] = hits.get(lang, 0) + text_lower.count(ch)
+            if hits[lang] >= self.decisive_min_hits:
+                logger.debug(f"Idioma detectado: {lang} (marcadores exclusivos)")
+                return lang
+
+        # Palabras distintas del texto (una sola tokenización)
+        words = set(_WORD_RE.findall(text_lower))
 
-        best_lang = max(scores.items(), key=lambda x: x[1])[0]
-        logger.debug(f"Idioma detectado: {best_lang} (scores: {scores})")
+        scores = np.fromiter(
+            (score(words, text_lower) for score in self._scorers),
+            dtype=float, count=len(self._scorers))
+
+        # Determinar idioma basado en puntuación
+        best_lang = self._languages[int(scores.argmax())]
+        logger.debug(
+            f"Idioma detectado: {best_lang} (scores: {dict(zip(self._languages, scores.round(3).tolist()))})")
         return best_lang
 
+    def _build_scorer(self, lang: str):
+        """
+        Construye la función de puntuación de un idioma.
+
+        La puntuación es la proporción de palabras comunes encontradas más el
+        peso del idioma si aparece alguno de sus marcadores.
+
+        Args:
+            lang: Código del idioma
+
+        Returns:
+            Función (words, text_lower) -> puntuación
+        """
+        common = self.common_words[lang]
+        common_size = float(len(common))
+        marker_search = self._marker_patterns[lang].search \
+            if lang in self._marker_patterns else None
+        weight = self.marker_weights.get(lang, 0.0)
+
+        def score(words: set, text_lower: str) -> float:
+            result = len(common.intersection(words)) / common_size
+            if weight and marker_search and marker_search(text_lower):
+                result += weight
+            return result
+
+        return score
+
+    def detect_batch(self, texts: List[str]) -> List[str]:
+        """
+        Detecta el idioma de varios textos.
+
+        Args:
+            texts: Textos para analizar
+
+        Returns:
+            Lista de códigos ISO, en el mismo orden que los textos
+        """
+        return [self.detect(text) for text in texts]
+
 
 # ===== Detector avanzado usando FastText =====
 
+class _RustFastTextModel:
+    """
+    Adaptador de underthesea_core.FastText (inferencia en Rust) a la API
+    de predict() de la librería fasttext.
+    """
+
+    def __init__(self, model):
+        self._model = model
+
+    def predict(self, text, k=1):
+        """Devuelve (etiquetas, probabilidades) para un texto o una lista."""
+        if isinstance(text, str):
+            pairs = self._model.predict(text, k=k)
+            return (tuple(label for label, _ in pairs),
+                    tuple(score for _, score in pairs))
+
+        results = [self.predict(t, k=k) for t in text]
+        return [labels for labels, _ in results], [scores for _, scores in results]
+
+
+# Modelos FastText cargados por ruta, compartidos por todo el proceso
+_fasttext_models: Dict[str, object] = {}
+_fasttext_lock = threading.Lock()
+
+
+def _resolve_fasttext_model_path(model_path: str) -> Path:
+    """
+    Resuelve la ruta del modelo FastText, priorizando la variante cuantizada.
+
+    El modelo .ftz (~1 MB) carga mucho más rápido y ocupa mucha menos memoria
+    que el .bin completo (~126 MB), con una precisión prácticamente igual.
+    Si la ruta configurada no existe se busca el modelo en Directories.MODELS.
+
+    Args:
+        model_path: Ruta configurada del modelo
+
+    Returns:
+        Path: Ruta del modelo a cargar
+    """
+    path = Path(model_path)
+    candidates = [path.with_suffix(".ftz"), path]
+    fallback = Directories.MODELS / "fasttext" / path.name
+    candidates += [fallback.with_suffix(".ftz"), fallback]
+
+    for candidate in candidates:
+        if candidate.exists():
+            return candidate
+    return path
+
+
+def _load_fasttext_model(model_path: Path):
+    """
+    Carga un modelo FastText con el backend más rápido disponible.
+
+    Prefiere la inferencia en Rust de underthesea_core y recurre a la
+    librería fasttext si no está instalada. Cada modelo se carga una sola
+    vez por proceso, aunque varios hilos lo soliciten a la vez.
+
+    Returns:
+        Modelo con la API predict(text, k) de fasttext
+    """
+    key = str(model_path)
+    model = _fasttext_models.get(key)
+    if model is not None:
+        return model
+
+    with _fasttext_lock:
+        if key not in _fasttext_models:
+            try:
+                from underthesea_core import FastText as _RustFastText
+                logger.info("Backend FastText: underthesea_core (Rust)")
+                model = _RustFastTextModel(_RustFastText.load(key))
+            except ImportError:
+                import fasttext
+                logger.info("Backend FastText: fasttext (C++)")
+                model = fasttext.load_model(key)
+            _fasttext_models[key] = model
+        return _fasttext_models[key]
+
+
+# FastText predice sobre una sola línea: los saltos se sustituyen por espacios
+_FASTTEXT_NEWLINES = str.maketrans("\r\n", "  ")
+
+
 class FastTextLanguageDetector:
     """
     Detector de idiomas basado en el modelo FastText.
@@ -133,11 +327,15 @@ class FastTextLanguageDetector:
     idiomas en texto con alta precisión.
     """
 
+    __slots__ = ('lang_config', 'model', 'model_path',
+                 'supported_languages', 'default_language')
+
     def __init__(self):
         """Inicializa el detector cargando el modelo FastText si está disponible."""
         self.lang_config = app_config.language
         self.model = None
-        self.model_path = self.lang_config["fasttext_model_path"]
+        self.model_path = _resolve_fasttext_model_path(
+            self.lang_config["fasttext_model_path"])
         self.supported_languages = self.lang_config["supported_languages"]
         self.default_language = self.lang_config["default_language"]
 
@@ -147,8 +345,6 @@ class FastTextLanguageDetector:
     def _load_model(self):
         """Carga el modelo FastText si está disponible."""
         try:
-            import fasttext
-
             model_path = Path(self.model_path)
             if not model_path.exists():
                 logger.warning(f"Modelo FastText no encontrado en {model_path}. "
@@ -156,12 +352,45 @@ class FastTextLanguageDetector:
                 return
 
             logger.info(f"Cargando modelo FastText desde {model_path}")
-            self.model = fasttext.load_model(str(model_path))
+            self.model = _load_fasttext_model(model_path)
             logger.success("Modelo FastText cargado correctamente")
 
         except ImportError:
             logger.warning("Librería FastText no instalada. "
-                           "Para habilitar la detección avanzada de idiomas, instala: pip install fasttext")
+                           "Para habilitar la detección avanzada de idiomas, instala: "
+                           "pip install underthesea-core (o pip install fasttext)")
+
+    def _is_detectable(self, text: str) -> bool:
+        """Indica si el texto es suficientemente largo para analizarlo."""
+        min_length = self.lang_config.get("text_min_length", 50)
+        return bool(text) and len(text.strip()) >= min_length
+
+    def _select_language(self, labels, scores) -> str:
+        """
+        Elige el primer idioma soportado con confianza suficiente.
+
+        Args:
+            labels: Etiquetas devueltas por FastText ('__label__es', ...)
+            scores: Probabilidades asociadas a cada etiqueta
+
+        Returns:
+            Código ISO del idioma o el idioma por defecto
+        """
+        min_confidence = self.lang_config["min_confidence"]
+        for label, score in zip(labels, scores):
+            # FastText usa códigos como 'en' y 'es', tomamos los primeros 2 caracteres
+            lang_code = label.replace('__label__', '')[:2].lower()
+            if lang_code in self.supported_languages:
+                confidence = float(score)
+                logger.debug(
+                    f"Idioma detectado con FastText: {lang_code} (confianza: {confidence:.2f})")
+
+                if confidence >= min_confidence:
+                    return lang_code
+
+        logger.debug(
+            "No se encontró un idioma soportado con suficiente confianza")
+        return self.default_language
 
     def detect(self, text: str) -> str:
         """
@@ -173,49 +402,61 @@ class FastTextLanguageDetector:
         Returns:
             Código ISO del idioma detectado
         """
-        if not self.model or not text or len(text.strip()) < self.lang_config["text_min_length"]:
+        if not self.model or not self._is_detectable(text):
             return self.default_language
 
         try:
             # Normalizar texto para análisis
-            text = text.replace('\n', ' ').strip()
+            text = text.translate(_FASTTEXT_NEWLINES).strip()
 
             # Predecir idioma con FastText
-            predictions = self.model.predict(text, k=3)
-            languages = [lang.replace('__label__', '')
-                         for lang in predictions[0]]
-            scores = predictions[1]
-
-            # Filtrar idiomas soportados
-            for i, lang in enumerate(languages):
-                # FastText usa códigos como 'en' y 'es', tomamos los primeros 2 caracteres
-                lang_code = lang[:2].lower()
-                if lang_code in self.supported_languages:
-                    confidence = float(scores[i])
-                    logger.debug(
-                        f"Idioma detectado con FastText: {lang_code} (confianza: {confidence:.2f})")
-
-                    if confidence >= self.lang_config["min_confidence"]:
-                        return lang_code
-
-            logger.debug(
-                "No se encontró un idioma soportado con suficiente confianza")
-            return self.default_language
+            labels, scores = self.model.predict(text, k=3)
+            return self._select_language(labels, scores)
 
         except Exception as e:
             logger.error(
                 f"Error en la detección de idioma con FastText: {str(e)}")
             return self.default_language
 
+    def detect_batch(self, texts: List[str]) -> List[str]:
+        """
+        Detecta el idioma de varios textos con una sola llamada a FastText.
+
+        Args:
+            texts: Textos para analizar (por ejemplo, una entrada por página)
+
+        Returns:
+            Lista de códigos ISO, en el mismo orden que los textos
+        """
+        results = [self.default_language] * len(texts)
+        if not self.model:
+            return results
+
+        # Solo se envían al modelo los textos con longitud suficiente
+        indices = [i for i, text in enumerate(texts)
+                   if self._is_detectable(text)]
+        if not indices:
+            return results
+
+        try:
+            cleaned = [texts[i].translate(_FASTTEXT_NEWLINES).strip()
+                       for i in indices]
+            all_labels, all_scores = self.model.predict(cleaned, k=3)
+            for i, labels, scores in zip(indices, all_labels, all_scores):
+                results[i] = self._select_language(labels, scores)
+        except Exception as e:
+            logger.error(
+                f"Error en la detección de idioma con FastText: {str(e)}")
+
+        return results
+
 
 # ===== Fábrica de detectores de idiomas =====
 
-# Variable para la disponibilidad de FastText
-try:
-    import fasttext
-    FASTTEXT_AVAILABLE = True
-except (ImportError, ModuleNotFoundError):
-    FASTTEXT_AVAILABLE = False
+# Variable para la disponibilidad de FastText: basta con localizar uno de
+# los dos backends, que se importa al cargar el modelo
+FASTTEXT_AVAILABLE = (importlib.util.find_spec("underthesea_core") is not None
+                      or importlib.util.find_spec("fasttext") is not None)
 
 
 class LanguageDetectorFactory:
@@ -237,10 +478,17 @@ class LanguageDetectorFactory:
     if FASTTEXT_AVAILABLE:
         implementations["fasttext"] = FastTextLanguageDetector
 
+    # Instancias ya creadas (una por tipo) y cerrojo para crearlas
+    _instances: Dict[str, object] = {}
+    _lock = threading.Lock()
+
     @classmethod
     def create(cls, detector_type: str) -> LanguageDetector:
         """
-        Crea una instancia del detector especificado.
+        Obtiene la instancia del detector especificado.
+
+        Cada tipo se instancia una sola vez por proceso; la creación está
+        protegida para que hilos concurrentes no carguen el modelo dos veces.
 
         Args:
             detector_type: Tipo de detector a crear ('basic', 'fasttext', etc)
@@ -248,13 +496,42 @@ class LanguageDetectorFactory:
         Returns:
             Instancia del detector solicitado o del detector básico si no existe
         """
-        if detector_type not in cls.implementations:
+        # Camino rápido: una sola consulta al diccionario de instancias
+        detector = cls._instances.get(detector_type)
+        if detector is not None:
+            return detector
+
+        with cls._lock:
+            detector = cls._instances.get(detector_type)
+            if detector is None:
+                detector = cls._create_locked(detector_type)
+                # También los tipos desconocidos quedan resueltos (al básico),
+                # de modo que el aviso se registra una sola vez
+                cls._instances[detector_type] = detector
+        return detector
+
+    @classmethod
+    def _create_locked(cls, detector_type: str):
+        """
+        Crea la instancia de un tipo de detector (con el cerrojo adquirido).
+
+        Args:
+            detector_type: Tipo de detector a crear
+
+        Returns:
+            Nueva instancia, o la del detector básico si el tipo no existe
+        """
+        implementation = cls.implementations.get(detector_type)
+        if implementation is None:
             logger.warning(f"Tipo de detector '{detector_type}' no disponible. "
                            f"Tipos disponibles: {list(cls.implementations.keys())}")
-            detector_type = "basic"
+            basic = cls._instances.get("basic")
+            if basic is None:
+                basic = cls._instances["basic"] = cls._create_locked("basic")
+            return basic
 
         logger.debug(f"Creando detector de idioma: {detector_type}")
-        return cls.implementations[detector_type]()
+        return implementation()
 
     @classmethod
     def register(cls, name: str, implementation: Type) -> None:
@@ -265,7 +542,9 @@ class LanguageDetectorFactory:
             name: Nombre para la implementación
             implementation: Clase de la implementación
         """
-        cls.implementations[name] = implementation
+        with cls._lock:
+            cls.implementations[name] = implementation
+            cls._instances.pop(name, None)
         logger.debug(f"Registrado detector de idioma: {name}")
 
 
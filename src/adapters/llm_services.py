@@ -8,16 +8,16 @@ y otras operaciones avanzadas de procesamiento de texto.
 
 import re
 import time
-from typing import Any, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 # Importaciones internas
-from shared.util.config import AppConfig
+from shared.util.config import config as app_config
 from adapters.providers.llm_factory import LLMProviderFactory
 from domain.ports.llm_provider import LLMProvider
 from infrastructure.logging_setup import logger
+from infrastructure.llm_cache import get_llm_cache
 
-# Instancia de configuración
-app_config = AppConfig()
 
 # Patrones comunes de corrección OCR
 OCR_PATTERNS = {
@@ -29,11 +29,70 @@ OCR_PATTERNS = {
 }
 
 
+# Todos los patrones son clases de un solo carácter: se aplican juntos como
+# una tabla de traducción (una única pasada en C sobre el texto)
+_OCR_TRANSLATION = str.maketrans({
+    char: replacement
+    for pattern, replacement in OCR_PATTERNS.items()
+    for char in pattern.strip("[]")
+})
+
+
 def _correct_ocr_errors(text: str) -> str:
     """Corrige errores comunes de OCR usando patrones de sustitución."""
-    for pattern, replacement in OCR_PATTERNS.items():
-        text = re.sub(pattern, replacement, text)
-    return text
+    return text.translate(_OCR_TRANSLATION)
+
+
+# Separador de párrafos (líneas en blanco)
+_PARAGRAPH_SEPARATOR = re.compile(r'\n\s*\n')
+
+
+def _chunk_spans(text: str, chunk_size: int) -> List[Tuple[int, int]]:
+    """
+    Agrupa los párrafos del texto en fragmentos de tamaño manejable.
+
+    Trabaja con posiciones sobre el texto original en lugar de crear una
+    cadena por párrafo y volver a unirlas.
+
+    Args:
+        text: Texto a dividir
+        chunk_size: Tamaño máximo de cada fragmento
+
+    Returns:
+        Lista de rangos (inicio, fin) de cada fragmento, en orden
+    """
+    spans = []
+    chunk_start = chunk_end = None
+    current_size = 0
+
+    para_start = 0
+    separators = _PARAGRAPH_SEPARATOR.finditer(text)
+    while para_start is not None:
+        separator = next(separators, None)
+        para_end = separator.start() if separator else len(text)
+        para_size = para_end - para_start
+
+        if current_size + para_size > chunk_size:
+            if chunk_start is not None:
+                # Cerrar el fragmento actual y empezar otro con este párrafo
+                spans.append((chunk_start, chunk_end))
+                chunk_start, chunk_end = para_start, para_end
+                current_size = para_size
+            else:
+                # Párrafo demasiado grande: fragmento propio
+                spans.append((para_start, para_end))
+        else:
+            if chunk_start is None:
+                chunk_start = para_start
+            chunk_end = para_end
+            current_size += para_size
+
+        para_start = separator.end() if separator else None
+
+    if chunk_start is not None:
+        spans.append((chunk_start, chunk_end))
+
+    return spans
 
 
 class LLMRefiner:
@@ -45,6 +104,9 @@ class LLMRefiner:
     errores y mejorando la coherencia.
     """
 
+    __slots__ = ('config', 'max_retries', 'retry_delay',
+                 'system_prompt', 'provider', '_cache_namespace')
+
     def __init__(self):
         """Inicializa el refinador con la configuración actual."""
         self.config = app_config.llm
@@ -55,6 +117,24 @@ class LLMRefiner:
         # Prompt del sistema para refinar texto
         self.system_prompt = "Eres un asistente especializado en mejorar la calidad de texto extraído por OCR. Corrige errores tipográficos, mejora la coherencia y el formato, pero mantén todo el contenido original. No agregues información nueva."
         self.provider = self._get_provider()
+        self._cache_namespace = self._get_cache_namespace()
+
+    def _get_cache_namespace(self) -> str:
+        """
+        Identifica proveedor, modelo y temperatura en las claves de caché.
+
+        La caché se conserva entre sesiones: cambiar de modelo o de
+        temperatura no debe devolver respuestas obtenidas con otros.
+
+        Returns:
+            str: Espacio de nombres "proveedor/modelo/temperatura"
+        """
+        provider_type = self.config.provider or ""
+        try:
+            model = app_config.get_llm_provider_config(provider_type)["model"]
+        except ValueError:
+            model = ""
+        return f"{provider_type}/{model}/{self.config.temperature}"
 
     def _get_provider(self) -> Optional[LLMProvider]:
         """
@@ -94,92 +174,159 @@ class LLMRefiner:
         """
         return self.provider is not None and self.config.mode != 'off'
 
-    def refine(self, text: str, max_chunk_size: int = 4000) -> str:
+    def refine(self, text: str, max_chunk_size: int = 4000,
+               from_ocr: bool = True) -> str:
         """
         Refina el texto usando el proveedor LLM configurado.
 
         Args:
             text: Texto a refinar
             max_chunk_size: Tamaño máximo de cada fragmento para procesar
+            from_ocr: Si el texto procede del OCR; solo entonces se aplican
+                las correcciones de caracteres de OCR al prompt
 
         Returns:
-            Texto refinado o el texto original si hay un error
+            Texto refinado o, si el refinamiento falla, el texto original
+            sin modificar
         """
         if not self.provider or not text:
             return text
 
-        # Aplicar correcciones básicas primero
-        text = _correct_ocr_errors(text)
-
         # Para textos largos, procesar por fragmentos
         if len(text) > max_chunk_size:
-            return self._process_large_text(text, max_chunk_size)
+            return self._process_large_text(text, max_chunk_size, from_ocr)
 
         # Procesar texto completo si es suficientemente pequeño
-        return self._refine_chunk(text)
+        refined = self._refine_chunk(text, from_ocr)
+        return text if refined is None else refined
 
-    def _process_large_text(self, text: str, chunk_size: int) -> str:
+    def refine_batch(self, texts: List[str], max_chunk_size: int = 4000,
+                     from_ocr: Optional[Sequence[bool]] = None) -> List[str]:
+        """
+        Refina varios textos (p. ej. las páginas de un documento) con
+        peticiones concurrentes al proveedor, en lugar de una tras otra.
+
+        Args:
+            texts: Textos a refinar
+            max_chunk_size: Tamaño máximo de cada fragmento para procesar
+            from_ocr: Si cada texto procede del OCR (por defecto, todos)
+
+        Returns:
+            Textos refinados (u originales si falla su refinamiento), en el
+            mismo orden que la entrada
+        """
+        if not self.provider or not texts:
+            return list(texts)
+
+        if from_ocr is None:
+            from_ocr = [True] * len(texts)
+
+        def refine_one(text: str, text_from_ocr: bool) -> str:
+            return self.refine(text, max_chunk_size, text_from_ocr)
+
+        # Las llamadas al proveedor son E/S: basta con hilos, limitados por
+        # LLM_CONCURRENCY para no saturar los límites de la API
+        max_workers = max(1, min(self.config.concurrency, len(texts)))
+        if max_workers == 1:
+            return list(map(refine_one, texts, from_ocr))
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(refine_one, texts, from_ocr))
+
+    def _process_large_text(self, text: str, chunk_size: int,
+                            from_ocr: bool) -> str:
         """
         Procesa textos largos dividiéndolos en fragmentos manejables.
 
         Args:
             text: Texto largo a procesar
             chunk_size: Tamaño máximo de cada fragmento
+            from_ocr: Si el texto procede del OCR
 
         Returns:
-            Texto completo procesado
+            Texto completo procesado; los fragmentos que no se pudieron
+            refinar se conservan tal cual
         """
-        # Dividir el texto en párrafos
-        paragraphs = re.split(r'\n\s*\n', text)
-
-        # Agrupar párrafos en fragmentos de tamaño manejable
-        chunks = []
-        current_chunk = []
-        current_size = 0
-
-        for para in paragraphs:
-            para_size = len(para)
-
-            if current_size + para_size > chunk_size:
-                # Si el fragmento actual excede el tamaño, procesarlo
-                if current_chunk:
-                    chunk_text = "\n\n".join(current_chunk)
-                    refined_chunk = self._refine_chunk(chunk_text)
-                    chunks.append(refined_chunk)
-
-                    # Reiniciar fragmento
-                    current_chunk = [para]
-                    current_size = para_size
-                else:
-                    # Si un párrafo es demasiado grande, procesarlo individualmente
-                    refined_para = self._refine_chunk(para)
-                    chunks.append(refined_para)
-            else:
-                # Añadir párrafo al fragmento actual
-                current_chunk.append(para)
-                current_size += para_size
+        # Los fragmentos se cortan del texto original una sola vez
+        chunks = [text[start:end]
+                  for start, end in _chunk_spans(text, chunk_size)]
+        refined = [self._refine_chunk(chunk, from_ocr) for chunk in chunks]
 
-        # Procesar el último fragmento si existe
-        if current_chunk:
-            chunk_text = "\n\n".join(current_chunk)
-            refined_chunk = self._refine_chunk(chunk_text)
-            chunks.append(refined_chunk)
+        # Si no se refinó ningún fragmento se devuelve el texto intacto
+        if all(result is None for result in refined):
+            return text
 
         # Unir todos los fragmentos procesados
-        return "\n\n".join(chunks)
+        return "\n\n".join(chunk if result is None else result
+                            for chunk, result in zip(chunks, refined))
 
-    def _refine_chunk(self, text: str) -> str:
+    def _refine_chunk(self, text: str, from_ocr: bool) -> Optional[str]:
         """
         Refina un fragmento de texto usando el proveedor LLM.
 
         Args:
             text: Fragmento de texto a refinar
+            from_ocr: Si el fragmento procede del OCR
 
         Returns:
-            Texto refinado o el original si hay un error
+            Texto refinado, o None si no se pudo refinar (el llamador
+            conserva entonces el fragmento original)
         """
         if not text.strip():
-            return text
+            return None
+
+        # Fragmentos repetidos (encabezados, pies de página...) no vuelven
+        # a enviarse al proveedor. La clave usa el texto original: las
+        # correcciones de OCR solo cambian lo que se envía
+        llm_cache = get_llm_cache()
+        namespace = f"{self._cache_namespace}/ocr" if from_ocr else self._cache_namespace
+        cache_key = llm_cache.make_key(self.system_prompt, text, namespace)
+        cached = llm_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        # Aplicar correcciones básicas de OCR solo al texto reconocido
+        prompt = _correct_ocr_errors(text) if from_ocr else text
+        retries = 0
+
+        while retries <= self.max_retries:
+            try:
+                # Enviar al LLM para refinamiento
+                response = self.provider.generate_completion(
+                    prompt,
+                    system_prompt=self.system_prompt,
+                    temperature=self.config.temperature
+                )
+
+                if response and response.strip():
+                    refined = response.strip()
+                    llm_cache.set(cache_key, refined)
+                    return refined
+
+                logger.warning("El proveedor LLM devolvió una respuesta vacía")
+                return None
+
+            except Exception as e:
+                retries += 1
+                logger.warning(
+                    f"Error refinando texto (intento {retries}/{self.max_retries}): {e}")
+
+                if retries <= self.max_retries:
+                    time.sleep(self.retry_delay)
+                else:
+                    logger.error(
+                        f"Refinamiento fallido después de {self.max_retries} intentos")
+
+        return None
+
+        # Fragmentos repetidos (encabezados, pies de página...) no vuelven
+        # a enviarse al proveedor
+        llm_cache = get_llm_cache()
+        cache_key = llm_cache.make_key(
+            self.system_prompt, text, self._cache_namespace)
+        cached = llm_cache.get(cache_key)
+        if cached is not None:
+            return cached
 
         retries = 0
 
@@ -187,14 +334,15 @@ class LLMRefiner:
             try:
                 # Enviar al LLM para refinamiento
                 response = self.provider.generate_completion(
+                    text,
                     system_prompt=self.system_prompt,
-                    user_prompt=text,
-                    max_tokens=self.config.max_tokens,
                     temperature=self.config.temperature
                 )
 
                 if response and response.strip():
-                    return response.strip()
+                    refined = response.strip()
+                    llm_cache.set(cache_key, refined)
+                    return refined
 
                 logger.warning("El proveedor LLM devolvió una respuesta vacía")
                 return text
@@ -209,6 +357,5 @@ class LLMRefiner:
                 else:
                     logger.error(
                         f"Refinamiento fallido después de {self.max_retries} intentos")
-                    return text
 
         return text
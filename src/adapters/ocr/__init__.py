@@ -1,10 +1,11 @@
 """
 Módulo OCR centralizado.
 
-Este módulo expone todas las funcionalidades del OCR estructuradas en 3 componentes:
+Este módulo expone todas las funcionalidades del OCR estructuradas en 4 componentes:
 - ocr_engine: Motor principal y configuración
 - ocr_image: Procesamiento de imágenes y tablas
 - ocr_text: Procesamiento de texto OCR
+- ocr_tesseract: Acceso a Tesseract (tesserocr o pytesseract)
 """
 
 # Importamos desde los nuevos módulos refactorizados
@@ -12,6 +13,18 @@ from .ocr_engine import (
     extract_text_from_pdf,
     extract_text_from_image,
     process_pdf_file,
+    render_page,
+    perform_ocr_on_image,
+    analyze_page,
+    ocr_analyzed_page,
+    postprocess_page_text,
+    ocr_image_files,
+    perform_ocr_on_pages,
+    process_pool_context,
+    refine_page_text,
+    refine_pages_text,
+    get_llm_refiner,
+    is_blank_page,
     OCR_LANG,
     DPI,
     build_tesseract_config
@@ -19,21 +32,38 @@ from .ocr_engine import (
 
 from .ocr_image import (
     correct_rotation,
+    correct_page_rotation,
     estimate_psm_for_page,
+    prepare_binary,
     has_visual_table,
     detect_table_regions,
     extract_tables_from_page,
     create_mask_without_tables,
-    ocr_table_to_markdown
+    ocr_table_to_markdown,
+    ocr_tables_to_markdown,
+    ocr_page_words,
+    split_words_by_regions,
+    words_to_text,
+    words_to_markdown
+)
+
+from .ocr_tesseract import (
+    TESSEROCR_AVAILABLE,
+    detect_rotation,
+    image_to_words
 )
 
 from .ocr_text import (
     apply_corrections,
+    apply_manual_corrections,
+    cleanup_text,
     fix_line_breaks,
     apply_legal_corrections,
     clean_and_format_text,
     detect_language,
-    split_into_sections
+    split_into_sections,
+    detect_lists,
+    detect_structured_headings
 )
 
 __all__ = [
@@ -41,24 +71,52 @@ __all__ = [
     'extract_text_from_pdf',
     'extract_text_from_image',
     'process_pdf_file',
+    'render_page',
+    'perform_ocr_on_image',
+    'analyze_page',
+    'ocr_analyzed_page',
+    'postprocess_page_text',
+    'ocr_image_files',
+    'perform_ocr_on_pages',
+    'process_pool_context',
+    'refine_page_text',
+    'refine_pages_text',
+    'get_llm_refiner',
+    'is_blank_page',
     'OCR_LANG',
     'DPI',
     'build_tesseract_config',
 
     # De ocr_image
     'correct_rotation',
+    'correct_page_rotation',
     'estimate_psm_for_page',
+    'prepare_binary',
     'has_visual_table',
     'detect_table_regions',
     'extract_tables_from_page',
     'create_mask_without_tables',
     'ocr_table_to_markdown',
+    'ocr_tables_to_markdown',
+    'ocr_page_words',
+    'split_words_by_regions',
+    'words_to_text',
+    'words_to_markdown',
+
+    # De ocr_tesseract
+    'TESSEROCR_AVAILABLE',
+    'detect_rotation',
+    'image_to_words',
 
     # De ocr_text
     'apply_corrections',
+    'apply_manual_corrections',
+    'cleanup_text',
     'fix_line_breaks',
     'apply_legal_corrections',
     'clean_and_format_text',
     'detect_language',
-    'split_into_sections'
+    'split_into_sections',
+    'detect_lists',
+    'detect_structured_headings'
 ]
@@ -5,8 +5,16 @@ Este módulo contiene el motor principal del OCR y la configuración central.
 """
 
 import logging
-from io import BytesIO
+import multiprocessing as mp
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import nullcontext
+from functools import lru_cache, partial
+from multiprocessing import shared_memory
 from pathlib import Path
+from typing import List, Optional, Tuple
 
 import cv2
 import fitz
@@ -15,6 +23,8 @@ import pytesseract
 from PIL import Image
 
 from adapters.llm_services import LLMRefiner
+from .ocr_tesseract import (TESSEROCR_AVAILABLE, image_to_string,
+                            single_threaded_tesseract)
 
 # ───────────────────── CONFIGURACIÓN ─────────────────────
 DPI = 300
@@ -25,14 +35,37 @@ CORRECTIONS_PATH = Path("src/shared/storage/data/corrections.csv")
 # Configurar logger
 logger = logging.getLogger(__name__)
 
-# Inicializar el refinador LLM
-llm_refiner = LLMRefiner()
 
+@lru_cache(maxsize=1)
+def get_llm_refiner() -> LLMRefiner:
+    """
+    Devuelve el refinador LLM compartido, creándolo en el primer uso.
+
+    Crear el refinador resuelve el proveedor y su cliente, así que se
+    pospone hasta que realmente se necesita refinar.
+    """
+    return LLMRefiner()
+
+
+def _user_file_option(flag: str, path: Path) -> str:
+    """Devuelve la opción de Tesseract para un archivo de usuario si existe."""
+    return f"{flag} {path}" if path.exists() else ""
 
+
+# Archivos personalizados de usuario (resueltos una sola vez al importar)
+USER_WORDS_OPTION = _user_file_option(
+    "--user-words", Path("src/shared/storage/data/legal_words.txt"))
+USER_PATTERNS_OPTION = _user_file_option(
+    "--user-patterns", Path("src/shared/storage/data/legal_patterns.txt"))
+
+
+@lru_cache(maxsize=16)
 def build_tesseract_config(psm: int) -> str:
     """
     Construye la configuración de Tesseract OCR personalizada.
 
+    Solo hay unos pocos valores de PSM, así que el resultado se cachea.
+
     Args:
         psm (int): Page Segmentation Mode para Tesseract.
 
@@ -42,78 +75,248 @@ def build_tesseract_config(psm: int) -> str:
     parts = [
         f"--psm {psm}",
         "--oem 3",
-        f"-c user_defined_dpi={DPI}"
+        f"-c user_defined_dpi={DPI}",
+        USER_WORDS_OPTION,
+        USER_PATTERNS_OPTION,
     ]
+    return " ".join(part for part in parts if part)
+
+
+def render_page(page: fitz.Page) -> np.ndarray:
+    """
+    Rasteriza una página PDF a un array uint8 en escala de grises.
+
+    Todo el análisis y el OCR trabajan en escala de grises, así que PyMuPDF
+    rasteriza directamente a un canal: un tercio de los bytes de RGB y sin
+    conversión posterior.
+
+    Args:
+        page: Página PDF de PyMuPDF
+
+    Returns:
+        np.ndarray: Píxeles (alto, ancho) de la página renderizada a DPI
+    """
+    pix = page.get_pixmap(dpi=DPI, alpha=False, colorspace=fitz.csGRAY)
+    return np.frombuffer(pix.samples, dtype=np.uint8).reshape(
+        pix.height, pix.width)
 
-    # Archivos personalizados de usuario (si existen)
-    words_path = Path("src/shared/storage/data/legal_words.txt")
-    patterns_path = Path("src/shared/storage/data/legal_patterns.txt")
 
-    if words_path.exists():
-        parts.append(f"--user-words {words_path}")
-    if patterns_path.exists():
-        parts.append(f"--user-patterns {patterns_path}")
+def to_grayscale(img) -> np.ndarray:
+    """
+    Convierte una imagen (PIL o array de píxeles) a escala de grises.
+
+    Con un array de render_page la conversión se hace con OpenCV sobre los
+    mismos píxeles, sin pasar antes por una copia de PIL.
+
+    Args:
+        img: Imagen PIL o array uint8 (alto, ancho[, canales])
+
+    Returns:
+        np.ndarray: Imagen en escala de grises (alto, ancho)
+    """
+    img_np = np.asarray(img)
+    if img_np.ndim == 2:
+        return img_np
+    if img_np.shape[2] == 4:
+        return cv2.cvtColor(img_np, cv2.COLOR_RGBA2GRAY)
+    if img_np.shape[2] == 1:
+        return img_np[:, :, 0]
+    return cv2.cvtColor(img_np, cv2.COLOR_RGB2GRAY)
+
+
+# Detección de páginas en blanco, calibrada con render_page (300 ppp, A4).
+# Proporción de píxeles oscuros medida:
+#   - una línea de título a 14 pt: ~2e-3
+#   - "ANEXO I" a 24 pt: ~1e-3
+#   - un número de página aislado a 10 pt: ~3e-5
+#   - moteado de escaneo (300 a 1000 puntos de 1-3 px): 1.6e-4 a 5e-4
+# La proporción no separa el moteado de una página casi vacía, así que entre
+# ambos umbrales se buscan componentes conexos del tamaño de un carácter (el
+# número de página mide ~30 px de alto y los puntos de moteado no pasan de 4).
+# Por debajo de esta proporción la página está en blanco sin más comprobaciones
+BLANK_PAGE_INK_RATIO = 1e-5
+# Por encima de esta proporción (más del doble que una línea de título) la
+# página tiene contenido sin más comprobaciones
+BLANK_PAGE_CONTENT_RATIO = 0.005
+# Altura mínima (px) de un componente conexo para contarlo como carácter
+BLANK_PAGE_MIN_GLYPH_HEIGHT = 8
+
+
+def is_blank_page(img, threshold: float = BLANK_PAGE_INK_RATIO) -> bool:
+    """
+    Determina si una página renderizada está prácticamente en blanco.
 
-    return " ".join(parts)
+    Una página con poca tinta solo se considera en blanco si, además, no
+    contiene ningún trazo del tamaño de un carácter: separadores, títulos de
+    anexo o números de página aislados se siguen procesando.
 
+    Args:
+        img: Imagen de la página (PIL o array de píxeles)
+        threshold: Proporción de píxeles oscuros por debajo de la cual la
+            página se considera en blanco directamente
 
-def perform_ocr_on_page(page: fitz.Page) -> str:
+    Returns:
+        bool: True si la página no tiene nada que reconocer
+    """
+    gray = to_grayscale(img)
+    ink = gray < 128
+    ink_ratio = np.count_nonzero(ink) / gray.size
+    if ink_ratio < threshold:
+        return True
+    if ink_ratio >= BLANK_PAGE_CONTENT_RATIO:
+        return False
+
+    n_labels, _, stats, _ = cv2.connectedComponentsWithStats(
+        ink.view(np.uint8), connectivity=8)
+    heights = stats[1:n_labels, cv2.CC_STAT_HEIGHT]
+    return not np.any(heights >= BLANK_PAGE_MIN_GLYPH_HEIGHT)
+
+
+def perform_ocr_on_page(page: fitz.Page, page_text: Optional[str] = None,
+                        refine: bool = True) -> str:
     """
     Realiza OCR sobre una página PDF.
 
     Args:
         page: Página PDF de PyMuPDF
+        page_text: Texto seleccionable ya extraído de la página (opcional)
+        refine: Si se aplica el refinamiento LLM a la página
+
+    Returns:
+        str: Texto extraído y procesado
+    """
+    # 1) Render
+    pixels = render_page(page)
+    if page_text is None:
+        page_text = page.get_text()
+    return perform_ocr_on_image(Image.fromarray(pixels), page_text,
+                                page.get_text("blocks"), refine=refine,
+                                pixels=pixels)
+
+
+def perform_ocr_on_image(img: Image.Image, page_text: str, page_blocks: list,
+                         refine: bool = True,
+                         pixels: Optional[np.ndarray] = None) -> str:
+    """
+    Realiza OCR sobre una página ya rasterizada.
+
+    Args:
+        img: Imagen de la página renderizada
+        page_text: Texto seleccionable de la página original
+        page_blocks: Bloques de texto de la página original
+        refine: Si se aplica el refinamiento LLM (los workers de OCR lo
+            desactivan y el proceso padre lo aplica después)
+        pixels: Píxeles de la página (render_page) de los que procede img;
+            si se pasan, el análisis de imagen trabaja sobre ellos sin
+            volver a extraerlos de la imagen PIL
 
     Returns:
         str: Texto extraído y procesado
     """
+    analysis = analyze_page(img, page_text, page_blocks, pixels=pixels)
+    if analysis is None:
+        return ""
+
+    img, config, table_regions = analysis
+    result = ocr_analyzed_page(img, config, table_regions)
+    return postprocess_page_text(result, refine=refine)
+
+
+def analyze_page(img: Image.Image, page_text: str, page_blocks: list,
+                 pixels: Optional[np.ndarray] = None) -> Optional[tuple]:
+    """
+    Prepara una página para el OCR: rotación, PSM y detección de tablas.
+
+    Args:
+        img: Imagen de la página renderizada
+        page_text: Texto seleccionable de la página original
+        page_blocks: Bloques de texto de la página original
+        pixels: Píxeles de la página (render_page) de los que procede img
+
+    Returns:
+        tuple o None: (imagen corregida en escala de grises, config de
+            Tesseract, regiones de tablas), o None si la página está en blanco
+    """
     # Importar aquí para evitar referencias circulares
-    from .ocr_image import correct_rotation, estimate_psm_for_page, has_visual_table
-    from .ocr_image import extract_tables_from_page, ocr_table_to_markdown, create_mask_without_tables
-    from .ocr_text import cleanup_text, apply_manual_corrections, detect_lists, detect_structured_headings
+    from .ocr_image import correct_page_rotation, estimate_psm_for_page, has_visual_table
+    from .ocr_image import prepare_binary, extract_table_lines, detect_table_regions
 
-    # 1) Render
-    pix = page.get_pixmap(dpi=DPI, alpha=False)
-    img_data = pix.tobytes("png")
-    img = Image.open(BytesIO(img_data))
+    # Todo el análisis y el OCR trabajan en escala de grises: se convierte
+    # una sola vez y Tesseract recibe una imagen de un canal (un tercio de
+    # los datos que hay que serializar en cada llamada)
+    gray = to_grayscale(pixels if pixels is not None else img)
+
+    # Páginas en blanco (portadas, separadores): sin tinta no hay nada
+    # que reconocer y se evitan todas las llamadas a Tesseract
+    if is_blank_page(gray):
+        logger.info("Página en blanco, se omite el OCR")
+        return None
 
     # 2) Corregir rotación automáticamente
-    img = correct_rotation(img)
+    img, gray = correct_page_rotation(Image.fromarray(gray), gray)
 
     # 3) Detectar el mejor PSM (modo de segmentación de página)
-    psm = estimate_psm_for_page(page, img)
+    psm = estimate_psm_for_page(None, img, text=page_text, blocks=page_blocks)
     config = build_tesseract_config(psm)
 
-    # 4) Detectar si hay tablas
-    has_tables = has_visual_table(img)
+    # 4) Detectar si hay tablas (la máscara de líneas se comparte con la
+    # localización de tablas)
+    binary = prepare_binary(gray)
+    table_mask = extract_table_lines(binary)
+    table_regions = []
+    if has_visual_table(img, table_mask=table_mask):
+        # Localizar tablas primero
+        logger.info("Página contiene tablas. Extrayendo...")
+        table_regions = detect_table_regions(img, table_mask=table_mask)
+
+    return img, config, table_regions
+
+
+def ocr_analyzed_page(img: Image.Image, config: str, table_regions: list) -> str:
+    """
+    Ejecuta Tesseract sobre una página ya analizada con analyze_page.
+
+    Args:
+        img: Imagen de la página (ya con la rotación corregida)
+        config: Configuración de Tesseract
+        table_regions: Regiones de tablas [(x, y, w, h), ...]
+
+    Returns:
+        str: Texto OCR sin postprocesar (con las tablas en Markdown)
+    """
+    from .ocr_image import ocr_page_words, split_words_by_regions
+    from .ocr_image import words_to_text, words_to_markdown
 
     # 5) Ejecutar OCR
     logger.info(f"Ejecutando OCR con config: {config}")
-    if has_tables:
-        # Extraer tablas primero
-        logger.info("Página contiene tablas. Extrayendo...")
-        tables = extract_tables_from_page(img)
-        if tables:
-            # Convertir tablas a Markdown
-            table_md = "\n\n".join([ocr_table_to_markdown(t) for t in tables])
-            logger.info(f"Tablas extraídas: {len(tables)}")
-
-            # Ejecutar OCR en el resto de la página (sin tablas)
-            mask = create_mask_without_tables(img, tables)
-            text = pytesseract.image_to_string(
-                mask, lang=OCR_LANG, config=config)
-
-            # Combinar texto y tablas
-            result = f"{text}\n\n{table_md}"
-        else:
-            # Si falló la extracción de tablas, procesar toda la página
-            text = pytesseract.image_to_string(
-                img, lang=OCR_LANG, config=config)
-            result = text
-    else:
-        # OCR normal (sin tablas)
-        text = pytesseract.image_to_string(img, lang=OCR_LANG, config=config)
-        result = text
+    if not table_regions:
+        # OCR normal (sin tablas, o si falló la extracción de tablas)
+        return image_to_string(img, OCR_LANG, config)
+
+    # Un único OCR de la página completa: las palabras dentro de cada
+    # tabla se reutilizan para generar su Markdown
+    words = ocr_page_words(img, config)
+    body_words, table_words = split_words_by_regions(words, table_regions)
+    table_md = "\n\n".join(words_to_markdown(t) for t in table_words if t)
+    logger.info(f"Tablas extraídas: {len(table_regions)}")
+
+    # Combinar texto y tablas
+    text = words_to_text(body_words)
+    return f"{text}\n\n{table_md}"
+
+
+def postprocess_page_text(result: str, refine: bool = True) -> str:
+    """
+    Aplica el postprocesamiento al texto OCR de una página.
+
+    Args:
+        result: Texto OCR sin postprocesar
+        refine: Si se aplica el refinamiento LLM
+
+    Returns:
+        str: Texto extraído y procesado
+    """
+    from .ocr_text import cleanup_text, apply_manual_corrections, detect_lists, detect_structured_headings
 
     # 6) Postprocesamiento
     result = cleanup_text(result)
@@ -126,29 +329,222 @@ def perform_ocr_on_page(page: fitz.Page) -> str:
     result = detect_structured_headings(result)
 
     # 9) Refinamiento LLM (opcional)
-    if llm_refiner.is_enabled():
-        try:
-            refined_text = llm_refiner.refine_ocr_text(result)
-            if refined_text:
-                logger.info("Texto refinado por LLM")
-                result = refined_text
-        except Exception as e:
-            logger.error(f"Error en refinamiento LLM: {e}")
+    if refine:
+        result = refine_page_text(result)
 
     return result
 
 
-def needs_ocr(page: fitz.Page) -> bool:
+def ocr_image_files(image_paths: List[str], config: str, list_path: str) -> List[str]:
+    """
+    Ejecuta Tesseract una sola vez sobre varias imágenes guardadas en disco.
+
+    Tesseract acepta como entrada un archivo de texto con la ruta de una
+    imagen por línea; así el proceso y el modelo de idioma se cargan una
+    sola vez para todas ellas, en lugar de una vez por página. Con tesserocr
+    no hace falta: la API en proceso ya reutiliza el modelo cargado.
+
+    Args:
+        image_paths: Rutas de las imágenes, todas con la misma configuración
+        config: Configuración de Tesseract
+        list_path: Ruta donde escribir la lista de imágenes
+
+    Returns:
+        List[str]: Texto OCR de cada imagen, en el mismo orden
+    """
+    if TESSEROCR_AVAILABLE:
+        return [image_to_string(path, OCR_LANG, config) for path in image_paths]
+
+    Path(list_path).write_text("\n".join(image_paths) + "\n", encoding="utf-8")
+    output = pytesseract.image_to_string(list_path, lang=OCR_LANG, config=config)
+
+    # Tesseract separa las páginas con un salto de página (form feed)
+    texts = output.split("\f")
+    if len(texts) > len(image_paths) and not "".join(texts[len(image_paths):]).strip():
+        texts = texts[:len(image_paths)]
+    if len(texts) != len(image_paths):
+        logger.warning("Salida por lotes de Tesseract inesperada; "
+                       "se procesan las imágenes una a una")
+        texts = [image_to_string(path, OCR_LANG, config) for path in image_paths]
+    return texts
+
+
+def refine_page_text(text: str) -> str:
+    """
+    Refina con el LLM el texto OCR de una página, si está habilitado.
+
+    Args:
+        text: Texto OCR ya postprocesado
+
+    Returns:
+        str: Texto refinado, o el original si el LLM no está disponible
+    """
+    llm_refiner = get_llm_refiner()
+    if not llm_refiner.is_enabled():
+        return text
+
+    try:
+        refined_text = llm_refiner.refine(text)
+        if refined_text:
+            logger.info("Texto refinado por LLM")
+            return refined_text
+    except Exception as e:
+        logger.error(f"Error en refinamiento LLM: {e}")
+
+    return text
+
+
+def refine_pages_text(texts: List[str],
+                      from_ocr: Optional[List[bool]] = None) -> List[str]:
+    """
+    Refina con el LLM el texto OCR de varias páginas en un solo lote.
+
+    Args:
+        texts: Texto OCR postprocesado de cada página
+        from_ocr: Si cada página procede del OCR (por defecto, todas); a las
+            páginas con texto digital no se les aplican correcciones de OCR
+
+    Returns:
+        List[str]: Textos refinados (u originales si el LLM no está disponible)
+    """
+    llm_refiner = get_llm_refiner()
+    if not llm_refiner.is_enabled():
+        return texts
+
+    try:
+        refined = llm_refiner.refine_batch(texts, from_ocr=from_ocr)
+        logger.info(f"Texto de {len(texts)} páginas refinado por LLM")
+        return [new or old for new, old in zip(refined, texts)]
+    except Exception as e:
+        logger.error(f"Error en refinamiento LLM: {e}")
+        return texts
+
+
+def process_pool_context() -> mp.context.BaseContext:
+    """
+    Contexto de multiprocessing para los pools de procesos del pipeline.
+
+    No se usa fork: el proceso anfitrión (servidor web, hilos de refinamiento
+    LLM, pools de Tesseract) puede tener hilos vivos, y un hijo creado con
+    fork hereda los locks que esos hilos tuvieran tomados y puede bloquearse.
+    forkserver arranca los workers desde un proceso limpio sin hilos; donde
+    no existe (Windows, macOS antiguo) se usa spawn. En ambos casos los
+    workers importan de nuevo los módulos, por lo que las funciones que
+    ejecutan deben estar definidas a nivel de módulo.
+
+    Returns:
+        mp.context.BaseContext: Contexto forkserver o spawn
+    """
+    if 'forkserver' in mp.get_all_start_methods():
+        return mp.get_context('forkserver')
+    return mp.get_context('spawn')
+
+
+def _init_ocr_worker() -> None:
+    """
+    Inicializador de cada proceso del pool de OCR.
+    Importa una sola vez los módulos de imagen y texto que usa el pipeline.
+    """
+    from . import ocr_image, ocr_text  # noqa: F401
+
+
+def _ocr_shared_page(shm_name: str, shape: Tuple[int, ...],
+                     page_text: str, page_blocks: list) -> str:
+    """
+    Función auxiliar para procesamiento en paralelo.
+    Ejecuta el OCR (sin refinamiento LLM) sobre una página ya rasterizada
+    por el proceso padre en memoria compartida.
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        # Copia local: el bloque compartido queda libre al volver del worker
+        pixels = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf).copy()
+    finally:
+        shm.close()
+    return perform_ocr_on_image(Image.fromarray(pixels), page_text,
+                                page_blocks, refine=False, pixels=pixels)
+
+
+def _release_page_buffer(shm: shared_memory.SharedMemory,
+                         slots: threading.BoundedSemaphore, _future=None) -> None:
+    """
+    Libera el bloque de memoria compartida de una página y su hueco en el pool.
+    """
+    shm.close()
+    shm.unlink()
+    slots.release()
+
+
+def perform_ocr_on_pages(pages: list, max_workers: Optional[int] = None,
+                         refine: bool = True) -> List[str]:
+    """
+    Realiza OCR sobre varias páginas en paralelo con un pool de procesos.
+
+    Las páginas se rasterizan una sola vez en el proceso actual y sus
+    píxeles llegan a los workers a través de memoria compartida; un
+    semáforo limita cuántas páginas renderizadas conviven en memoria. El
+    refinamiento LLM se aplica aquí, fuera de los workers.
+
+    Args:
+        pages: Páginas PDF de PyMuPDF
+        max_workers: Número de procesos (por defecto, núcleos disponibles)
+        refine: Si se aplica el refinamiento LLM a los textos obtenidos
+
+    Returns:
+        List[str]: Texto extraído y procesado por página, en orden
+    """
+    if not pages:
+        return []
+
+    max_workers = max(1, min(max_workers or os.cpu_count() or 1, len(pages)))
+    if max_workers == 1:
+        # Con un solo proceso no compensa arrancar el pool
+        texts = [perform_ocr_on_page(page, refine=False) for page in pages]
+        return refine_pages_text(texts) if refine else texts
+
+    # Como máximo dos páginas renderizadas por worker en vuelo
+    slots = threading.BoundedSemaphore(2 * max_workers)
+    futures = []
+
+    with ProcessPoolExecutor(max_workers=max_workers,
+                             mp_context=process_pool_context(),
+                             initializer=_init_ocr_worker) as executor:
+        for page in pages:
+            slots.acquire()
+            pixels = render_page(page)
+            shm = shared_memory.SharedMemory(create=True, size=pixels.nbytes)
+            try:
+                np.ndarray(pixels.shape, dtype=np.uint8,
+                           buffer=shm.buf)[:] = pixels
+                future = executor.submit(
+                    _ocr_shared_page, shm.name, pixels.shape,
+                    page.get_text(), page.get_text("blocks"))
+            except Exception:
+                _release_page_buffer(shm, slots)
+                raise
+            future.add_done_callback(partial(_release_page_buffer, shm, slots))
+            futures.append(future)
+
+        texts = [future.result() for future in futures]
+
+    return refine_pages_text(texts) if refine else texts
+
+
+def needs_ocr(page: fitz.Page, text: Optional[str] = None) -> bool:
     """
     Determina si una página necesita OCR revisando si contiene texto seleccionable.
 
     Args:
         page (fitz.Page): Página a analizar.
+        text (str, optional): Texto ya extraído de la página, para no
+            volver a extraerlo.
 
     Returns:
         bool: True si no hay texto y se debe aplicar OCR.
     """
-    text = page.get_text().strip()
+    if text is None:
+        text = page.get_text()
+    text = text.strip()
     return len(text) < 50  # Si hay menos de 50 caracteres, aplicar OCR
 
 
@@ -165,17 +561,20 @@ def extract_blocks(page: fitz.Page) -> list:
     return page.get_text("blocks")
 
 
-def extract_text_from_pdf(page: fitz.Page) -> str:
+def extract_text_from_pdf(page: fitz.Page, page_text: Optional[str] = None,
+                          refine: bool = True) -> str:
     """
     Extrae texto de una página PDF usando OCR si es necesario.
 
     Args:
         page (fitz.Page): Página de PDF a procesar
+        page_text (str, optional): Texto seleccionable ya extraído de la página
+        refine (bool): Si se aplica el refinamiento LLM a la página
 
     Returns:
         str: Texto extraído y procesado
     """
-    return perform_ocr_on_page(page)
+    return perform_ocr_on_page(page, page_text, refine=refine)
 
 
 def extract_text_from_image(image_path: str) -> str:
@@ -193,7 +592,7 @@ def extract_text_from_image(image_path: str) -> str:
 
     img = Image.open(image_path)
     config = build_tesseract_config(6)  # PSM 6 para imágenes
-    text = pytesseract.image_to_string(img, lang=OCR_LANG, config=config)
+    text = image_to_string(img, OCR_LANG, config)
 
     # Postprocesamiento
     text = cleanup_text(text)
@@ -202,34 +601,125 @@ def extract_text_from_image(image_path: str) -> str:
     return text
 
 
-def process_pdf_file(pdf_path: str) -> dict:
+def _prepare_pdf_page(pixels: np.ndarray, page_text: str, page_blocks: list,
+                      image_path: str) -> tuple:
+    """
+    Función auxiliar para el pool de hilos de process_pdf_file.
+    Analiza una página ya rasterizada y, o bien la reconoce directamente
+    (páginas con tablas), o bien la deja en disco para el OCR por lotes.
+
+    Returns:
+        tuple: (texto, None) si la página ya está resuelta, o
+            (None, config) si quedó guardada en image_path para el lote
+    """
+    img = Image.fromarray(pixels)
+    analysis = analyze_page(img, page_text, page_blocks, pixels=pixels)
+    if analysis is None:
+        return "", None
+
+    img, config, table_regions = analysis
+    if table_regions:
+        # Las páginas con tablas necesitan las posiciones de las
+        # palabras: se reconocen por separado
+        return postprocess_page_text(
+            ocr_analyzed_page(img, config, table_regions), refine=False), None
+
+    # Se guarda en disco (PNG de compresión rápida) para no mantener en
+    # memoria todas las páginas del lote
+    img.save(image_path, compress_level=1)
+    return None, config
+
+
+def process_pdf_file(pdf_path: str, max_workers: Optional[int] = None) -> dict:
     """
     Procesa un archivo PDF completo.
 
+    Las páginas se rasterizan en el hilo actual (PyMuPDF no es seguro entre
+    hilos) y su análisis se reparte en un pool de hilos: el trabajo pesado
+    ocurre en OpenCV y en los procesos de Tesseract, que no retienen el GIL.
+    Las páginas sin tablas que comparten configuración de Tesseract se
+    reconocen en una única llamada (ver ocr_image_files), y el texto de
+    todas las páginas reconocidas se refina con el LLM en un solo lote.
+
     Args:
         pdf_path (str): Ruta al archivo PDF
+        max_workers (int, optional): Número de hilos (por defecto, núcleos
+            disponibles)
 
     Returns:
         dict: Diccionario con el texto extraído por página
     """
+    max_workers = max_workers or os.cpu_count() or 1
+    # Páginas renderizadas en memoria a la vez: dos por hilo
+    window = 2 * max_workers
+
     result = {}
+    # Páginas reconocidas con OCR, que se refinan al final
+    ocr_page_nums = []
     try:
         doc = fitz.open(pdf_path)
-        for i, page in enumerate(doc):
-            page_num = i + 1
-            logger.info(f"Procesando página {page_num}/{len(doc)}")
+        # Con varios hilos, cada proceso de Tesseract en un solo hilo: el
+        # paralelismo lo aportan los hilos del pool
+        with tempfile.TemporaryDirectory(prefix="ocr_batch_") as tmp_dir, \
+                (single_threaded_tesseract() if max_workers > 1 else nullcontext()), \
+                ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = {}
+            # Páginas pendientes de OCR por lotes, agrupadas por configuración
+            batches = {}
+
+            def collect(futures: dict) -> None:
+                for page_num, (future, image_path) in futures.items():
+                    text, config = future.result()
+                    result[page_num] = text
+                    if config is not None:
+                        batches.setdefault(config, []).append(
+                            (page_num, image_path))
+                futures.clear()
+
+            for i, page in enumerate(doc):
+                page_num = i + 1
+                logger.info(f"Procesando página {page_num}/{len(doc)}")
+
+                # Un único get_text por página: sirve para decidir si hace
+                # falta OCR, como resultado directo y para estimar el PSM
+                page_text = page.get_text()
+                if not needs_ocr(page, page_text):
+                    logger.info(
+                        f"Extrayendo texto existente de la página {page_num}")
+                    result[page_num] = page_text
+                    continue
 
-            if needs_ocr(page):
                 logger.info(f"Aplicando OCR a la página {page_num}")
-                text = perform_ocr_on_page(page)
-            else:
-                logger.info(
-                    f"Extrayendo texto existente de la página {page_num}")
-                text = page.get_text()
-
-            result[page_num] = text
+                image_path = os.path.join(tmp_dir, f"page_{page_num:05d}.png")
+                result[page_num] = None
+                ocr_page_nums.append(page_num)
+                pending[page_num] = (executor.submit(
+                    _prepare_pdf_page, render_page(page), page_text,
+                    page.get_text("blocks"), image_path), image_path)
+                if len(pending) >= window:
+                    collect(pending)
+            collect(pending)
+
+            def run_batch(batch_idx: int, config: str, entries: list) -> None:
+                logger.info(f"Ejecutando OCR por lotes ({len(entries)} páginas) "
+                            f"con config: {config}")
+                list_path = os.path.join(tmp_dir, f"batch_{batch_idx}.txt")
+                texts = ocr_image_files([path for _, path in entries],
+                                        config, list_path)
+                for (page_num, _), text in zip(entries, texts):
+                    result[page_num] = postprocess_page_text(text, refine=False)
+
+            # Cada configuración es una llamada independiente a Tesseract
+            list(executor.map(run_batch, range(len(batches)),
+                              batches.keys(), batches.values()))
 
         doc.close()
+
+        # Refinamiento LLM de todas las páginas reconocidas en un solo lote
+        if ocr_page_nums:
+            refined = refine_pages_text([result[n] for n in ocr_page_nums])
+            for page_num, text in zip(ocr_page_nums, refined):
+                result[page_num] = text
         return result
     except Exception as e:
         logger.error(f"Error procesando PDF {pdf_path}: {e}")
@@ -247,7 +737,14 @@ def visualize_ocr_regions(img: Image.Image, regions: list) -> Image.Image:
     Returns:
         Image.Image: Imagen con regiones marcadas.
     """
-    img_np = np.array(img.copy())
+    # Una sola copia de los píxeles para dibujar; las páginas en escala de
+    # grises se pasan a RGB en esa misma copia para poder marcar en color
+    img_np = np.asarray(img)
+    if img_np.ndim == 2:
+        img_np = cv2.cvtColor(img_np, cv2.COLOR_GRAY2RGB)
+    else:
+        img_np = img_np.copy()
+
     for x, y, w, h in regions:
         cv2.rectangle(img_np, (x, y), (x + w, y + h), (0, 255, 0), 2)
     return Image.fromarray(img_np)
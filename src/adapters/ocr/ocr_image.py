@@ -5,17 +5,74 @@ Este módulo contiene funciones para procesamiento de imágenes y detección/ext
 """
 
 import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import Optional
 import cv2
 import fitz
 import numpy as np
-import pytesseract
 from PIL import Image
 
-from .ocr_engine import DPI, OCR_LANG, build_tesseract_config
+from shared.util.config import config as app_config
+from .ocr_engine import DPI, OCR_LANG, build_tesseract_config, to_grayscale
+from .ocr_tesseract import (detect_rotation, image_to_string, image_to_words,
+                            single_threaded_tesseract)
 
 # Configurar logger
 logger = logging.getLogger(__name__)
 
+# Aceleración OpenCL (T-API) de OpenCV: se activa una sola vez si hay dispositivo
+USE_OPENCL = cv2.ocl.haveOpenCL()
+if USE_OPENCL:
+    cv2.ocl.setUseOpenCL(True)
+
+# Elementos estructurantes (constantes, se crean una sola vez)
+_HORIZONTAL_LINE_KERNEL = cv2.getStructuringElement(cv2.MORPH_RECT, (40, 1))
+_VERTICAL_LINE_KERNEL = cv2.getStructuringElement(cv2.MORPH_RECT, (1, 40))
+_TABLE_DILATE_KERNEL = cv2.getStructuringElement(cv2.MORPH_RECT, (5, 5))
+_CELL_DILATE_KERNEL = cv2.getStructuringElement(cv2.MORPH_RECT, (3, 3))
+
+
+# Factor de reducción de la imagen para el OSD (300 DPI -> 75 DPI) y lado
+# mínimo de la miniatura para aplicarlo
+OSD_REDUCTION = 4
+OSD_MIN_SIZE = 500
+# Confianza mínima de la orientación del OSD para girar la página
+OSD_MIN_CONFIDENCE = 2.0
+
+# Rotación horaria indicada por el OSD -> (transposición de PIL, código de
+# cv2.rotate). Las transposiciones de PIL giran en sentido antihorario.
+_ROTATIONS = {
+    90: (Image.ROTATE_270, cv2.ROTATE_90_CLOCKWISE),
+    180: (Image.ROTATE_180, cv2.ROTATE_180),
+    270: (Image.ROTATE_90, cv2.ROTATE_90_COUNTERCLOCKWISE),
+}
+
+
+def _detect_page_rotation(img_pil: Image.Image) -> int:
+    """Rotación horaria (0, 90, 180, 270) que endereza la imagen, o 0 si falla."""
+    try:
+        # El OSD no necesita 300 DPI: se analiza una miniatura (reduce()
+        # promedia bloques, sin remuestreo general) y después se pasa a
+        # escala de grises directamente en PIL
+        thumb = img_pil
+        if min(img_pil.size) >= OSD_REDUCTION * OSD_MIN_SIZE:
+            thumb = img_pil.reduce(OSD_REDUCTION)
+        img_gray = thumb.convert("L")
+
+        # Detectar orientación con Tesseract OSD
+        angle, confidence = detect_rotation(img_gray)
+        if angle and confidence < OSD_MIN_CONFIDENCE:
+            logger.debug(f"Rotación de {angle}° descartada por baja confianza "
+                         f"({confidence:.2f})")
+            return 0
+        return angle
+    except Exception as e:
+        logger.warning(f"Error detectando rotación: {e}")
+        return 0
+
 
 def correct_rotation(img_pil: Image.Image) -> Image.Image:
     """
@@ -27,39 +84,52 @@ def correct_rotation(img_pil: Image.Image) -> Image.Image:
     Returns:
         Image.Image: Imagen rotada si se detectó desviación de ángulo.
     """
-    try:
-        img_np = np.array(img_pil)
+    img_pil, _ = correct_page_rotation(img_pil)
+    return img_pil
 
-        # Convertir a escala de grises si es necesario
-        if len(img_np.shape) == 3 and img_np.shape[2] == 3:
-            img_np = cv2.cvtColor(img_np, cv2.COLOR_RGB2GRAY)
 
-        # Detectar orientación con Tesseract OSD
-        osd = pytesseract.image_to_osd(img_np)
-        angle = int(osd.split('Rotate: ')[1].split('\n')[0])
-
-        if angle != 0:
-            logger.info(f"Corrigiendo rotación: {angle}°")
-            if angle == 90:
-                img_pil = img_pil.transpose(Image.ROTATE_90)
-            elif angle == 180:
-                img_pil = img_pil.transpose(Image.ROTATE_180)
-            elif angle == 270:
-                img_pil = img_pil.transpose(Image.ROTATE_270)
-
-        return img_pil
-    except Exception as e:
-        logger.warning(f"Error detectando rotación: {e}")
-        return img_pil
+def correct_page_rotation(img_pil: Image.Image,
+                          pixels: Optional[np.ndarray] = None) -> tuple:
+    """
+    Corrige la rotación de una página manteniendo sus píxeles en NumPy.
+
+    El OSD solo devuelve múltiplos de 90°, así que el giro es una simple
+    transposición de memoria. Si se pasan los píxeles de la página, se giran
+    con cv2.rotate y la imagen PIL se reconstruye a partir de ellos, de modo
+    que ambos siguen correspondiéndose.
+
+    Args:
+        img_pil (Image.Image): Imagen original.
+        pixels (np.ndarray, optional): Píxeles de los que procede img_pil.
+
+    Returns:
+        tuple: (imagen, píxeles) ya girados; los píxeles son None si no se
+            pasaron.
+    """
+    angle = _detect_page_rotation(img_pil)
+    if angle not in _ROTATIONS:
+        return img_pil, pixels
 
+    logger.info(f"Corrigiendo rotación: {angle}°")
+    transpose, rotate_code = _ROTATIONS[angle]
+    if pixels is None:
+        return img_pil.transpose(transpose), None
 
-def estimate_psm_for_page(page: fitz.Page, img: Image.Image) -> int:
+    pixels = cv2.rotate(pixels, rotate_code)
+    return Image.fromarray(pixels), pixels
+
+
+def estimate_psm_for_page(page: Optional[fitz.Page], img: Image.Image,
+                          text: Optional[str] = None,
+                          blocks: Optional[list] = None) -> int:
     """
     Estima el mejor Page Segmentation Mode (PSM) para una página.
 
     Args:
-        page (fitz.Page): Página PDF
+        page (fitz.Page): Página PDF (puede ser None si se pasan text y blocks)
         img (Image.Image): Imagen renderizada
+        text (str, optional): Texto ya extraído de la página
+        blocks (list, optional): Bloques de texto ya extraídos de la página
 
     Returns:
         int: PSM recomendado (1-13)
@@ -69,27 +139,24 @@ def estimate_psm_for_page(page: fitz.Page, img: Image.Image) -> int:
     aspect_ratio = width / height
 
     # Verificar si tiene bloques de texto o si es mayormente imagen
-    text = page.get_text().strip()
-    text_blocks = page.get_text("blocks")
+    if text is None:
+        text = page.get_text()
+    text = text.strip()
+    text_blocks = blocks if blocks is not None else page.get_text("blocks")
     has_text = len(text) > 100
     block_count = len(text_blocks)
 
     # Detectar posible estructura de columnas
     columns = 1
     if block_count > 3:
-        # Analizar distribución horizontal de bloques
-        x_positions = []
-        for block in text_blocks:
-            x_positions.append(block[0])  # x0
-            x_positions.append(block[2])  # x1
-
-        x_positions.sort()
-        x_ranges = set()
-        for pos in x_positions:
-            range_id = int(pos / (width * 0.2))  # Dividir en 5 rangos
-            x_ranges.add(range_id)
-
-        if len(x_ranges) >= 3:
+        # Analizar distribución horizontal de bloques (x0 y x1 de cada uno)
+        x_positions = np.fromiter(
+            (v for block in text_blocks for v in (block[0], block[2])),
+            dtype=np.float64, count=2 * block_count)
+        # Dividir en 5 rangos (int() trunca hacia cero)
+        x_ranges = np.unique(np.trunc(x_positions / (width * 0.2)))
+
+        if x_ranges.size >= 3:
             columns = 2
 
     # Seleccionar PSM basado en análisis
@@ -103,35 +170,113 @@ def estimate_psm_for_page(page: fitz.Page, img: Image.Image) -> int:
         return 4  # Texto continuo (para páginas con párrafos grandes)
 
 
-def has_visual_table(img: Image.Image) -> bool:
+def prepare_binary(img) -> np.ndarray:
     """
-    Detecta si una imagen probablemente contiene tablas usando análisis visual.
+    Binariza una imagen (Otsu, invertida) para el análisis de tablas.
+
+    Se calcula una vez por página y se comparte entre has_visual_table,
+    detect_table_regions y detect_table_cells.
 
     Args:
-        img (Image.Image): Imagen a analizar
+        img: Imagen a binarizar (PIL o array de píxeles de render_page)
 
     Returns:
-        bool: True si se detectaron posibles tablas
+        np.ndarray: Imagen binarizada (texto y líneas en blanco)
     """
-    # Convertir a escala de grises y binarizar
-    img_gray = np.array(img.convert("L"))
+    img_gray = to_grayscale(img)
     _, binary = cv2.threshold(
         img_gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    return binary
+
+
+# Buffers intermedios de cada hilo para las operaciones morfológicas
+_scratch = threading.local()
+
+
+def _scratch_buffer(name: str, shape: tuple) -> np.ndarray:
+    """
+    Devuelve un buffer uint8 reutilizable del hilo actual.
+
+    Las páginas de un documento suelen tener el mismo tamaño, así que el
+    buffer se reserva una vez y solo se vuelve a reservar si cambia la forma.
+    Su contenido se sobrescribe en la siguiente llamada del mismo hilo: solo
+    sirve para resultados intermedios que no salen de la función.
+
+    Args:
+        name (str): Nombre del buffer
+        shape (tuple): Forma requerida
+
+    Returns:
+        np.ndarray: Buffer sin inicializar
+    """
+    buffers = getattr(_scratch, "buffers", None)
+    if buffers is None:
+        buffers = _scratch.buffers = {}
+    buf = buffers.get(name)
+    if buf is None or buf.shape != shape:
+        buf = buffers[name] = np.empty(shape, dtype=np.uint8)
+    return buf
+
+
+def extract_table_lines(binary: np.ndarray) -> np.ndarray:
+    """
+    Extrae las líneas horizontales y verticales de una imagen binarizada.
+
+    Si OpenCV dispone de OpenCL, las operaciones morfológicas se ejecutan
+    sobre UMat (GPU integrada o dedicada) y el resultado se descarga a
+    memoria del host solo al final.
+
+    Args:
+        binary (np.ndarray): Imagen binarizada (texto y líneas en blanco)
 
-    # Detectar líneas horizontales y verticales (características de tablas)
-    horizontal_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (40, 1))
-    vertical_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (1, 40))
+    Returns:
+        np.ndarray: Máscara con las líneas de tabla
+    """
+    if USE_OPENCL:
+        src = cv2.UMat(binary)
+        horizontal_lines = cv2.morphologyEx(src, cv2.MORPH_OPEN, _HORIZONTAL_LINE_KERNEL)
+        vertical_lines = cv2.morphologyEx(src, cv2.MORPH_OPEN, _VERTICAL_LINE_KERNEL)
+        return cv2.bitwise_or(horizontal_lines, vertical_lines).get()
 
+    # En CPU, las máscaras intermedias van a buffers reutilizables del hilo
     horizontal_lines = cv2.morphologyEx(
-        binary, cv2.MORPH_OPEN, horizontal_kernel)
-    vertical_lines = cv2.morphologyEx(binary, cv2.MORPH_OPEN, vertical_kernel)
+        binary, cv2.MORPH_OPEN, _HORIZONTAL_LINE_KERNEL,
+        dst=_scratch_buffer("horizontal_lines", binary.shape))
+    vertical_lines = cv2.morphologyEx(
+        binary, cv2.MORPH_OPEN, _VERTICAL_LINE_KERNEL,
+        dst=_scratch_buffer("vertical_lines", binary.shape))
+
+    # Combinar líneas: ambas máscaras son 0/255, así que un OR basta (sin
+    # la aritmética saturada de cv2.add)
+    return cv2.bitwise_or(horizontal_lines, vertical_lines)
+
+
+def has_visual_table(img: Image.Image,
+                     binary: Optional[np.ndarray] = None,
+                     table_mask: Optional[np.ndarray] = None) -> bool:
+    """
+    Detecta si una imagen probablemente contiene tablas usando análisis visual.
+
+    Args:
+        img (Image.Image): Imagen a analizar
+        binary (np.ndarray, optional): Imagen ya binarizada con prepare_binary
+        table_mask (np.ndarray, optional): Líneas ya extraídas con
+            extract_table_lines
+
+    Returns:
+        bool: True si se detectaron posibles tablas
+    """
+    if table_mask is None:
+        # Convertir a escala de grises y binarizar
+        if binary is None:
+            binary = prepare_binary(img)
 
-    # Combinar para detectar intersecciones
-    table_mask = cv2.add(horizontal_lines, vertical_lines)
+        # Detectar líneas horizontales y verticales (características de tablas)
+        table_mask = extract_table_lines(binary)
 
     # Contar píxeles de líneas
     line_pixels = cv2.countNonZero(table_mask)
-    total_pixels = img_gray.size
+    total_pixels = table_mask.size
 
     # Si hay suficientes líneas en proporción al tamaño, probablemente hay tabla
     line_ratio = line_pixels / total_pixels
@@ -139,41 +284,40 @@ def has_visual_table(img: Image.Image) -> bool:
     return line_ratio > 0.005  # Umbral ajustable
 
 
-def detect_table_regions(img: Image.Image) -> list:
+def detect_table_regions(img: Image.Image,
+                         binary: Optional[np.ndarray] = None,
+                         table_mask: Optional[np.ndarray] = None) -> list:
     """
     Detecta regiones candidatas a ser tablas en la imagen.
 
     Args:
         img (Image.Image): Imagen a analizar
+        binary (np.ndarray, optional): Imagen ya binarizada con prepare_binary
+        table_mask (np.ndarray, optional): Líneas ya extraídas con
+            extract_table_lines (por ejemplo, las de has_visual_table)
 
     Returns:
         list: Lista de coordenadas de tablas [(x, y, w, h), ...]
     """
-    img_gray = np.array(img.convert("L"))
-    _, binary = cv2.threshold(
-        img_gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
-
-    # Detectar líneas horizontales y verticales
-    horizontal_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (40, 1))
-    vertical_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (1, 40))
+    if table_mask is None:
+        if binary is None:
+            binary = prepare_binary(img)
 
-    horizontal_lines = cv2.morphologyEx(
-        binary, cv2.MORPH_OPEN, horizontal_kernel)
-    vertical_lines = cv2.morphologyEx(binary, cv2.MORPH_OPEN, vertical_kernel)
-
-    # Combinar líneas
-    table_mask = cv2.add(horizontal_lines, vertical_lines)
+        # Detectar líneas horizontales y verticales
+        table_mask = extract_table_lines(binary)
 
-    # Dilatar para conectar regiones cercanas
-    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (5, 5))
-    table_mask = cv2.dilate(table_mask, kernel, iterations=3)
+    # Dilatar para conectar regiones cercanas (máscara intermedia: solo se
+    # usa para buscar contornos)
+    table_mask = cv2.dilate(table_mask, _TABLE_DILATE_KERNEL,
+                            dst=_scratch_buffer("table_regions", table_mask.shape),
+                            iterations=3)
 
     # Encontrar contornos de posibles tablas
     contours, _ = cv2.findContours(
         table_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
 
     # Filtrar contornos pequeños
-    min_area = img_gray.size * 0.005  # Área mínima (0.5% de la imagen)
+    min_area = table_mask.size * 0.005  # Área mínima (0.5% de la imagen)
     table_regions = []
 
     for contour in contours:
@@ -182,24 +326,26 @@ def detect_table_regions(img: Image.Image) -> list:
             # Expandir un poco los límites para asegurar capturar toda la tabla
             x = max(0, x - 10)
             y = max(0, y - 10)
-            w = min(img_gray.shape[1] - x, w + 20)
-            h = min(img_gray.shape[0] - y, h + 20)
+            w = min(table_mask.shape[1] - x, w + 20)
+            h = min(table_mask.shape[0] - y, h + 20)
             table_regions.append((x, y, w, h))
 
     return table_regions
 
 
-def extract_tables_from_page(img: Image.Image) -> list:
+def extract_tables_from_page(img: Image.Image,
+                             binary: Optional[np.ndarray] = None) -> list:
     """
     Extrae imágenes de tablas de una página.
 
     Args:
         img (Image.Image): Imagen de la página
+        binary (np.ndarray, optional): Imagen ya binarizada con prepare_binary
 
     Returns:
         list: Lista de imágenes de tablas (PIL.Image)
     """
-    table_regions = detect_table_regions(img)
+    table_regions = detect_table_regions(img, binary=binary)
     if not table_regions:
         return []
 
@@ -223,157 +369,409 @@ def create_mask_without_tables(img: Image.Image, table_regions: list) -> Image.I
     Returns:
         Image.Image: Imagen con regiones de tablas enmascaradas
     """
-    mask = np.array(img.copy())
+    # Una sola copia (np.array ya copia los píxeles de la imagen PIL)
+    mask = np.array(img)
 
     # Pintar de blanco las regiones de tablas
-    for table_img in table_regions:
-        x, y, w, h = table_img.getbbox()
+    for x, y, w, h in table_regions:
         mask[y:y+h, x:x+w] = 255
 
     return Image.fromarray(mask)
 
 
-def ocr_table_to_markdown(table_img: Image.Image) -> str:
+def ocr_table_to_markdown(table_img: Image.Image,
+                          binary: Optional[np.ndarray] = None) -> str:
     """
     Convierte una imagen de tabla a formato Markdown.
 
     Args:
         table_img (Image.Image): Imagen de la tabla
+        binary (np.ndarray, optional): Tabla ya binarizada
 
     Returns:
         str: Tabla en formato Markdown
     """
     # Detección de celdas
-    cells = detect_table_cells(table_img)
+    cells = detect_table_cells(table_img, binary=binary)
     if not cells:
         # Si no se detectaron celdas, intentar OCR directo
-        text = pytesseract.image_to_string(
-            table_img, lang=OCR_LANG, config='--psm 6')
+        text = image_to_string(table_img, OCR_LANG, '--psm 6')
         return f"```\n{text}\n```"
 
-    # Extraer texto de cada celda
+    # Extraer texto de cada celda (detect_table_cells las devuelve ya
+    # ordenadas por fila y columna)
     rows = {}
-    for (row, col), cell_img in cells.items():
-        text = pytesseract.image_to_string(
-            cell_img, lang=OCR_LANG, config='--psm 6').strip()
-        if row not in rows:
-            rows[row] = {}
-        rows[row][col] = text
+    for (row, col), text in ocr_cells_text(cells).items():
+        rows.setdefault(row, {})[col] = text
 
     # Determinar número de columnas
-    max_cols = 0
-    for row_data in rows.values():
-        max_cols = max(max_cols, max(row_data.keys(), default=0) + 1)
+    max_cols = max(max(row_data) + 1 for row_data in rows.values())
+    cols_range = range(max_cols)
+
+    return markdown_table(
+        [row_data.get(col_idx, "") for col_idx in cols_range]
+        for row_data in rows.values())
+
+
+def markdown_table(rows) -> str:
+    """
+    Genera una tabla Markdown con encabezados genéricos ("Columna N").
+
+    Args:
+        rows: Filas de la tabla (iterables de textos de celda); las filas
+            más cortas se completan con celdas vacías
+
+    Returns:
+        str: Tabla en formato Markdown
+    """
+    rows = [list(row) for row in rows]
+    max_cols = max(map(len, rows), default=0)
+    header = " | ".join([f"Columna {i + 1}" for i in range(max_cols)])
+    separator = " | ".join(["---"] * max_cols)
+    padding = [""] * max_cols
+    body = [" | ".join(row + padding[len(row):]) for row in rows]
+    return "\n".join([header, separator, *body])
+
+
+# Franja en blanco entre celdas al apilarlas para un único OCR
+CELL_SEPARATOR_HEIGHT = 20
+
+
+def _stack_images(arrays: list) -> tuple:
+    """
+    Apila imágenes verticalmente sobre fondo blanco, alineadas a la
+    izquierda y separadas por franjas de CELL_SEPARATOR_HEIGHT píxeles.
 
-    # Generar markdown
-    md_table = []
+    Args:
+        arrays (list): Imágenes como arrays con el mismo número de canales
+
+    Returns:
+        tuple: (imagen compuesta PIL, inicio vertical de cada imagen, alturas)
+    """
+    width = max(a.shape[1] for a in arrays)
+    starts = []
+    strips = []
+    top = 0
+    for a in arrays:
+        strip = np.full((a.shape[0] + CELL_SEPARATOR_HEIGHT, width) + a.shape[2:],
+                        255, dtype=np.uint8)
+        strip[:a.shape[0], :a.shape[1]] = a
+        strips.append(strip)
+        starts.append(top)
+        top += strip.shape[0]
+    heights = np.array([a.shape[0] for a in arrays])
+    return Image.fromarray(np.vstack(strips)), np.array(starts), heights
+
+
+def _split_stacked_words(words: list, starts: np.ndarray, heights: np.ndarray):
+    """
+    Asigna cada palabra del OCR de una imagen compuesta (ver _stack_images)
+    a la imagen de la que procede, por la posición vertical de su centro.
 
-    # Encabezados
-    header_row = " | ".join(["Columna " + str(i+1) for i in range(max_cols)])
-    md_table.append(header_row)
+    Returns:
+        list: Palabras de cada imagen, o None si alguna cae en una franja de
+            separación (alineación dudosa)
+    """
+    parts = [[] for _ in starts]
+    for word in words:
+        cy = word["top"] + word["height"] / 2
+        idx = int(np.searchsorted(starts, cy, side="right")) - 1
+        if cy >= starts[idx] + heights[idx]:
+            return None
+        parts[idx].append(word)
+    return parts
 
-    # Separador
-    separator = " | ".join(["---" for _ in range(max_cols)])
-    md_table.append(separator)
 
-    # Filas de datos
-    for row_idx in sorted(rows.keys()):
-        cols = []
-        for col_idx in range(max_cols):
-            cell_text = rows[row_idx].get(col_idx, "")
-            cols.append(cell_text)
-        md_table.append(" | ".join(cols))
+def ocr_tables_to_markdown(img: Image.Image, table_regions: list) -> list:
+    """
+    Convierte a Markdown todas las tablas de una página con un solo OCR.
 
-    return "\n".join(md_table)
+    Los recortes de las tablas se apilan en una imagen compuesta y las
+    palabras reconocidas se reparten entre ellas por su posición vertical.
+    Si el reparto es dudoso, cada tabla se reconoce por separado, en
+    paralelo en un pool de hilos.
 
+    Args:
+        img (Image.Image): Imagen de la página
+        table_regions (list): Regiones de tablas [(x, y, w, h), ...]
 
-def detect_table_cells(table_img: Image.Image) -> dict:
+    Returns:
+        list: Tabla en Markdown de cada región, en el mismo orden
+    """
+    if not table_regions:
+        return []
+
+    gray = to_grayscale(img)
+    crops = [gray[y:y + h, x:x + w] for x, y, w, h in table_regions]
+    composite, starts, heights = _stack_images(crops)
+
+    parts = _split_stacked_words(ocr_page_words(composite, '--psm 6'), starts, heights)
+    if parts is None:
+        logger.debug("OCR compuesto de tablas desalineado; "
+                     "se reconoce cada tabla por separado")
+        return _ocr_tables_separately(crops)
+
+    return [words_to_markdown(words) for words in parts]
+
+
+def ocr_cells_text(cells: dict) -> dict:
+    """
+    Reconoce el texto de todas las celdas de una tabla con un solo OCR.
+
+    Las celdas se apilan verticalmente en una imagen compuesta, separadas
+    por franjas en blanco, y cada palabra devuelta por Tesseract se asigna
+    a su celda por la posición vertical de su centro. Si alguna palabra cae
+    en una franja de separación (alineación dudosa), se vuelve al OCR por
+    celda en un pool de hilos.
+
+    Args:
+        cells (dict): Diccionario {(fila, columna): imagen_celda}
+
+    Returns:
+        dict: Diccionario {(fila, columna): texto}
+    """
+    keys = list(cells)
+    composite, starts, heights = _stack_images(
+        [np.asarray(cells[key].convert("RGB")) for key in keys])
+
+    cell_words = _split_stacked_words(
+        ocr_page_words(composite, '--psm 6'), starts, heights)
+    if cell_words is None:
+        logger.debug("OCR compuesto de celdas desalineado; "
+                     "se reconoce cada celda por separado")
+        return _ocr_cells_separately(cells)
+
+    return {key: words_to_text(w) for key, w in zip(keys, cell_words)}
+
+
+def _ocr_workers(n_items: int) -> int:
+    """
+    Hilos para reconocer n_items recortes en paralelo: OCR_CONCURRENCY si
+    está fijado, o los núcleos disponibles, sin superar n_items.
+    """
+    return max(1, min(n_items, app_config.ocr.concurrency or os.cpu_count() or 1))
+
+
+def _ocr_tables_separately(crops: list) -> list:
+    """
+    Convierte cada recorte de tabla a Markdown con sus propias llamadas a
+    Tesseract, en paralelo.
+    """
+    max_workers = _ocr_workers(len(crops))
+
+    # Cada proceso de Tesseract en un solo hilo: el paralelismo lo aportan
+    # los hilos del pool
+    with (single_threaded_tesseract() if max_workers > 1 else nullcontext()), \
+            ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(
+            lambda crop: ocr_table_to_markdown(Image.fromarray(crop)), crops))
+
+
+def _ocr_cells_separately(cells: dict) -> dict:
+    """Reconoce cada celda con su propia llamada a Tesseract, en paralelo."""
+    def ocr_cell(cell_img: Image.Image) -> str:
+        return image_to_string(cell_img, OCR_LANG, '--psm 6').strip()
+
+    max_workers = _ocr_workers(len(cells))
+    with (single_threaded_tesseract() if max_workers > 1 else nullcontext()), \
+            ThreadPoolExecutor(max_workers=max_workers) as executor:
+        texts = executor.map(ocr_cell, cells.values())
+        return dict(zip(cells.keys(), texts))
+
+
+def ocr_page_words(img: Image.Image, config: str) -> list:
+    """
+    Ejecuta Tesseract una sola vez sobre la página y devuelve sus palabras
+    con la posición de cada una.
+
+    Args:
+        img (Image.Image): Imagen de la página
+        config (str): Configuración de Tesseract
+
+    Returns:
+        list: Palabras [{'text', 'left', 'top', 'width', 'height', 'line'}],
+            en el orden de lectura de Tesseract. 'line' es la tupla
+            (bloque, párrafo, línea) asignada por Tesseract.
+    """
+    return image_to_words(img, OCR_LANG, config)
+
+
+def split_words_by_regions(words: list, regions: list) -> tuple:
+    """
+    Reparte las palabras entre las regiones de tabla según su centro.
+
+    Args:
+        words (list): Palabras devueltas por ocr_page_words
+        regions (list): Regiones de tablas [(x, y, w, h), ...]
+
+    Returns:
+        tuple: (palabras fuera de tablas, [palabras de cada región])
+    """
+    body = []
+    tables = [[] for _ in regions]
+    for word in words:
+        cx = word["left"] + word["width"] / 2
+        cy = word["top"] + word["height"] / 2
+        for idx, (x, y, w, h) in enumerate(regions):
+            if x <= cx < x + w and y <= cy < y + h:
+                tables[idx].append(word)
+                break
+        else:
+            body.append(word)
+    return body, tables
+
+
+def words_to_text(words: list) -> str:
+    """
+    Reconstruye texto plano a partir de palabras de Tesseract, respetando
+    sus líneas y separando los párrafos con una línea en blanco.
+
+    Args:
+        words (list): Palabras devueltas por ocr_page_words
+
+    Returns:
+        str: Texto reconstruido
+    """
+    lines = {}
+    for word in words:
+        lines.setdefault(word["line"], []).append(word["text"])
+
+    output = []
+    previous_par = None
+    for (block, par, _), line_words in lines.items():
+        if previous_par is not None and (block, par) != previous_par:
+            output.append("")
+        output.append(" ".join(line_words))
+        previous_par = (block, par)
+    return "\n".join(output)
+
+
+def words_to_markdown(words: list) -> str:
+    """
+    Convierte las palabras de una región de tabla a formato Markdown.
+
+    Las filas se agrupan por posición vertical y, dentro de cada fila, un
+    hueco horizontal amplio entre palabras separa una celda de la siguiente.
+
+    Args:
+        words (list): Palabras de la región (ver split_words_by_regions)
+
+    Returns:
+        str: Tabla en formato Markdown
+    """
+    if not words:
+        return ""
+
+    line_height = float(np.median([w["height"] for w in words])) or 1.0
+
+    # Agrupar palabras en filas por su centro vertical
+    rows = []
+    for word in sorted(words, key=lambda w: w["top"] + w["height"] / 2):
+        cy = word["top"] + word["height"] / 2
+        if rows and abs(cy - rows[-1][0]) <= line_height * 0.6:
+            rows[-1][1].append(word)
+        else:
+            rows.append([cy, [word]])
+
+    # Dividir cada fila en celdas por los huecos horizontales
+    table = []
+    for _, row_words in rows:
+        row_words.sort(key=lambda w: w["left"])
+        cells = [[row_words[0]["text"]]]
+        right = row_words[0]["left"] + row_words[0]["width"]
+        for word in row_words[1:]:
+            if word["left"] - right > line_height * 1.5:
+                cells.append([word["text"]])
+            else:
+                cells[-1].append(word["text"])
+            right = word["left"] + word["width"]
+        table.append([" ".join(cell) for cell in cells])
+
+    return markdown_table(table)
+
+
+def group_cells_into_rows(cell_coords: np.ndarray, tolerance: int = 10) -> list:
+    """
+    Agrupa celdas en filas por su coordenada Y y ordena cada fila por X.
+
+    Una fila empieza en la primera celda (por Y) y abarca todas las celdas
+    cuya Y no supera en más de `tolerance` píxeles a la de esa primera
+    celda. Tras ordenar las Y, el final de cada fila se localiza con una
+    búsqueda binaria, de modo que el bucle solo recorre filas, no celdas.
+
+    Args:
+        cell_coords (np.ndarray): Cajas de las celdas, forma (n, 4) con
+            columnas (x, y, w, h)
+        tolerance (int): Diferencia máxima de Y dentro de una fila
+
+    Returns:
+        list: Filas en orden vertical; cada una es un array (k, 4)
+            ordenado por X
+    """
+    cell_coords = cell_coords[np.argsort(cell_coords[:, 1], kind="stable")]
+    ys = cell_coords[:, 1]
+
+    rows = []
+    start = 0
+    while start < len(cell_coords):
+        end = int(np.searchsorted(ys, ys[start] + tolerance, side="right"))
+        row = cell_coords[start:end]
+        rows.append(row[np.argsort(row[:, 0], kind="stable")])
+        start = end
+    return rows
+
+
+def detect_table_cells(table_img: Image.Image,
+                       binary: Optional[np.ndarray] = None) -> dict:
     """
     Detecta celdas individuales en una imagen de tabla.
 
     Args:
         table_img (Image.Image): Imagen de la tabla
+        binary (np.ndarray, optional): Tabla ya binarizada (por ejemplo, el
+            recorte correspondiente de la binarización de la página)
 
     Returns:
         dict: Diccionario {(fila, columna): imagen_celda}
     """
     # Convertir a escala de grises y binarizar
-    img_gray = np.array(table_img.convert("L"))
-    _, binary = cv2.threshold(
-        img_gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    if binary is None:
+        binary = prepare_binary(table_img)
 
     # Detectar líneas horizontales y verticales
-    horizontal_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (40, 1))
-    vertical_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (1, 40))
-
-    horizontal_lines = cv2.morphologyEx(
-        binary, cv2.MORPH_OPEN, horizontal_kernel)
-    vertical_lines = cv2.morphologyEx(binary, cv2.MORPH_OPEN, vertical_kernel)
-
-    # Combinar líneas
-    grid_lines = cv2.add(horizontal_lines, vertical_lines)
+    grid_lines = extract_table_lines(binary)
 
     # Dilatar líneas para asegurar conexiones
-    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (3, 3))
-    grid_lines = cv2.dilate(grid_lines, kernel, iterations=1)
+    grid_lines = cv2.dilate(grid_lines, _CELL_DILATE_KERNEL, iterations=1)
 
-    # Encontrar contornos de celdas (áreas encerradas por líneas)
-    # Invertir la imagen para encontrar áreas encerradas
+    # Encontrar celdas (áreas encerradas por líneas): componentes conexas
+    # de la imagen invertida, con su caja y su área en una sola pasada
     inverted_grid = cv2.bitwise_not(grid_lines)
-    contours, _ = cv2.findContours(
-        inverted_grid, cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE)
+    _, _, stats, _ = cv2.connectedComponentsWithStats(
+        inverted_grid, connectivity=4)
 
-    # Filtrar contornos pequeños
+    # La etiqueta 0 son las propias líneas; las zonas que tocan el borde de
+    # la imagen quedan fuera de la rejilla y no son celdas
+    height, width = inverted_grid.shape
+    x, y, w, h, area = stats[1:].T
     min_area = 100  # Área mínima para considerar una celda
-    cell_contours = []
-
-    for contour in contours:
-        area = cv2.contourArea(contour)
-        if area >= min_area:
-            cell_contours.append(contour)
+    keep = ((area >= min_area) & (x > 0) & (y > 0) &
+            (x + w < width) & (y + h < height))
+    cell_coords = stats[1:, :4][keep]
 
     # Si no hay suficientes celdas, probablemente no es una tabla estructurada
-    if len(cell_contours) < 4:  # Mínimo para una tabla 2x2
+    if len(cell_coords) < 4:  # Mínimo para una tabla 2x2
         return {}
 
-    # Extraer coordenadas de celdas y ordenarlas por posición
-    cell_coords = []
-    for contour in cell_contours:
-        x, y, w, h = cv2.boundingRect(contour)
-        cell_coords.append((x, y, w, h))
-
-    # Ordenar por coordenada Y para agrupar filas
-    cell_coords.sort(key=lambda c: c[1])
-
     # Agrupar celdas en filas
-    rows = []
-    current_row = []
-    current_y = cell_coords[0][1]
-
-    for cell in cell_coords:
-        x, y, w, h = cell
-        # Si el cambio en Y es significativo, es una nueva fila
-        if abs(y - current_y) > 10:
-            if current_row:
-                # Ordenar la fila actual por X antes de añadirla
-                current_row.sort(key=lambda c: c[0])
-                rows.append(current_row)
-            current_row = [cell]
-            current_y = y
-        else:
-            current_row.append(cell)
-
-    # Añadir la última fila
-    if current_row:
-        current_row.sort(key=lambda c: c[0])
-        rows.append(current_row)
+    rows = group_cells_into_rows(cell_coords)
 
     # Convertir a diccionario de celdas {(fila, columna): imagen}
     cells = {}
-    table_img_np = np.array(table_img)
+    table_img_np = np.asarray(table_img)
 
     for row_idx, row in enumerate(rows):
-        for col_idx, (x, y, w, h) in enumerate(row):
+        for col_idx, (x, y, w, h) in enumerate(row.tolist()):
             # Recortar la celda
             cell_img = table_img_np[y:y+h, x:x+w]
             cells[(row_idx, col_idx)] = Image.fromarray(cell_img)
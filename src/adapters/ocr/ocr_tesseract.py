@@ -0,0 +1,334 @@
+"""
+Acceso a Tesseract.
+
+Este módulo centraliza las llamadas a Tesseract del pipeline OCR. Si tesserocr
+está instalado, se usa su API en proceso (PyTessBaseAPI), que mantiene el
+modelo de idioma cargado entre llamadas; si no, se recurre a pytesseract, que
+lanza un proceso de Tesseract por llamada.
+"""
+
+import hashlib
+import logging
+import os
+import shlex
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple, Union
+
+import pytesseract
+from PIL import Image
+
+# tesserocr es opcional: sin él se usa pytesseract
+try:
+    import tesserocr
+    TESSEROCR_AVAILABLE = True
+except ImportError:
+    tesserocr = None
+    TESSEROCR_AVAILABLE = False
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+# Formato en que pytesseract entrega las imágenes a Tesseract: TIFF sin
+# compresión evita la codificación PNG (zlib) de cada página
+PYTESSERACT_IMAGE_FORMAT = "TIFF"
+
+# Número de resultados de image_to_string que se conservan por contenido
+OCR_RESULT_CACHE_SIZE = 1024
+
+# Opciones de línea de comandos de Tesseract y su variable equivalente
+_FILE_OPTIONS = {
+    "--user-words": "user_words_file",
+    "--user-patterns": "user_patterns_file",
+}
+
+
+def parse_tesseract_config(config: str) -> Tuple[int, int, Dict[str, str]]:
+    """
+    Traduce una configuración de línea de comandos de Tesseract a parámetros
+    de la API.
+
+    Args:
+        config (str): Configuración, p. ej. "--psm 6 --oem 3 -c clave=valor"
+
+    Returns:
+        tuple: (psm, oem, variables)
+    """
+    psm, oem, variables = 3, 3, {}  # Valores por defecto de Tesseract
+    tokens = iter(shlex.split(config))
+    for token in tokens:
+        if token == "--psm":
+            psm = int(next(tokens))
+        elif token == "--oem":
+            oem = int(next(tokens))
+        elif token == "-c":
+            name, _, value = next(tokens).partition("=")
+            variables[name] = value
+        elif token in _FILE_OPTIONS:
+            variables[_FILE_OPTIONS[token]] = next(tokens)
+        else:
+            logger.debug(f"Opción de Tesseract no reconocida: {token}")
+    return psm, oem, variables
+
+
+# Bloques single_threaded_tesseract activos (protegido por _thread_limit_lock)
+_thread_limit_lock = threading.Lock()
+_thread_limit_users = 0
+_thread_limit_set = False
+
+
+@contextmanager
+def single_threaded_tesseract():
+    """
+    Limita Tesseract a un hilo (OMP_THREAD_LIMIT=1) mientras dura el bloque.
+
+    Cuando el paralelismo lo aportan varios hilos que lanzan Tesseract a la
+    vez, los hilos internos de OpenMP de cada proceso solo compiten entre
+    sí. La variable se fija únicamente si el usuario no la ha definido y se
+    retira al salir del último bloque activo, de modo que el resto de la
+    aplicación conserva el comportamiento por defecto.
+    """
+    global _thread_limit_users, _thread_limit_set
+    with _thread_limit_lock:
+        if _thread_limit_users == 0 and "OMP_THREAD_LIMIT" not in os.environ:
+            os.environ["OMP_THREAD_LIMIT"] = "1"
+            _thread_limit_set = True
+        _thread_limit_users += 1
+    try:
+        yield
+    finally:
+        with _thread_limit_lock:
+            _thread_limit_users -= 1
+            if _thread_limit_users == 0 and _thread_limit_set:
+                os.environ.pop("OMP_THREAD_LIMIT", None)
+                _thread_limit_set = False
+
+
+class _TesseractPool:
+    """
+    APIs de tesserocr reutilizables.
+
+    PyTessBaseAPI no es segura entre hilos, así que cada hilo mantiene sus
+    propias instancias, una por combinación de idioma y configuración (las
+    listas de palabras de usuario solo pueden fijarse al inicializar).
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def get(self, lang: str, config: str):
+        """
+        Obtiene la API del hilo actual para un idioma y configuración.
+
+        Args:
+            lang (str): Idioma(s) de Tesseract
+            config (str): Configuración de línea de comandos
+
+        Returns:
+            tesserocr.PyTessBaseAPI: API inicializada
+        """
+        apis = getattr(self._local, "apis", None)
+        if apis is None:
+            apis = self._local.apis = {}
+
+        key = (lang, config)
+        api = apis.get(key)
+        if api is None:
+            psm, oem, variables = parse_tesseract_config(config)
+            api = tesserocr.PyTessBaseAPI(
+                lang=lang, psm=psm, oem=oem, variables=variables)
+            apis[key] = api
+        return api
+
+
+_pool = _TesseractPool()
+
+
+def _for_pytesseract(img):
+    """
+    Prepara una imagen para pytesseract con el formato de la imagen temporal.
+
+    pytesseract guarda la imagen en el formato de su atributo format (PNG si
+    no tiene) y además fija ese atributo. Para no modificar la imagen del
+    llamador se trabaja sobre una copia.
+    """
+    if isinstance(img, Image.Image) and not img.format:
+        img = img.copy()
+        img.format = PYTESSERACT_IMAGE_FORMAT
+    return img
+
+
+class _OCRResultCache:
+    """
+    Caché LRU de textos reconocidos, indexada por el contenido de la imagen.
+
+    Las regiones repetidas (celdas vacías, membretes, sellos) se reconocen
+    una sola vez aunque aparezcan en varias páginas o tablas.
+    """
+
+    def __init__(self, maxsize: int):
+        self._maxsize = maxsize
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(img: Image.Image, lang: str, config: str) -> tuple:
+        """Clave de la imagen: resumen de sus píxeles, tamaño, modo y configuración."""
+        digest = hashlib.blake2b(img.tobytes(), digest_size=16).digest()
+        return digest, img.size, img.mode, lang, config
+
+    def get(self, key: tuple) -> Optional[str]:
+        with self._lock:
+            text = self._results.get(key)
+            if text is not None:
+                self._results.move_to_end(key)
+            return text
+
+    def put(self, key: tuple, text: str) -> None:
+        with self._lock:
+            self._results[key] = text
+            self._results.move_to_end(key)
+            if len(self._results) > self._maxsize:
+                self._results.popitem(last=False)
+
+
+_result_cache = _OCRResultCache(OCR_RESULT_CACHE_SIZE)
+
+
+def _set_image(api, img: Union[Image.Image, str]) -> None:
+    """Carga en la API una imagen PIL o la imagen de una ruta."""
+    if isinstance(img, str):
+        api.SetImageFile(img)
+    else:
+        api.SetImage(img)
+
+
+def image_to_string(img: Union[Image.Image, str], lang: str, config: str) -> str:
+    """
+    Reconoce el texto de una imagen.
+
+    Los resultados de imágenes PIL se cachean por contenido, de modo que una
+    región idéntica a otra ya reconocida no vuelve a pasar por Tesseract.
+
+    Args:
+        img: Imagen PIL o ruta de la imagen
+        lang (str): Idioma(s) de Tesseract
+        config (str): Configuración de Tesseract
+
+    Returns:
+        str: Texto reconocido
+    """
+    key = None
+    if isinstance(img, Image.Image):
+        key = _result_cache.key(img, lang, config)
+        text = _result_cache.get(key)
+        if text is not None:
+            return text
+
+    if not TESSEROCR_AVAILABLE:
+        text = pytesseract.image_to_string(
+            _for_pytesseract(img), lang=lang, config=config)
+    else:
+        api = _pool.get(lang, config)
+        _set_image(api, img)
+        text = api.GetUTF8Text()
+
+    if key is not None:
+        _result_cache.put(key, text)
+    return text
+
+
+def image_to_words(img: Image.Image, lang: str, config: str) -> list:
+    """
+    Reconoce las palabras de una imagen con la posición de cada una.
+
+    Args:
+        img (Image.Image): Imagen a reconocer
+        lang (str): Idioma(s) de Tesseract
+        config (str): Configuración de Tesseract
+
+    Returns:
+        list: Palabras [{'text', 'left', 'top', 'width', 'height', 'line'}],
+            en el orden de lectura de Tesseract. 'line' es la tupla
+            (bloque, párrafo, línea).
+    """
+    if not TESSEROCR_AVAILABLE:
+        data = pytesseract.image_to_data(
+            _for_pytesseract(img), lang=lang, config=config, output_type=pytesseract.Output.DICT)
+
+        words = []
+        for i, text in enumerate(data["text"]):
+            text = text.strip()
+            if not text:
+                continue
+            words.append({
+                "text": text,
+                "left": data["left"][i],
+                "top": data["top"][i],
+                "width": data["width"][i],
+                "height": data["height"][i],
+                "line": (data["block_num"][i], data["par_num"][i], data["line_num"][i]),
+            })
+        return words
+
+    api = _pool.get(lang, config)
+    api.SetImage(img)
+    api.Recognize()
+
+    RIL = tesserocr.RIL
+    words = []
+    block = par = line = 0
+    iterator = api.GetIterator()
+    if iterator is None:
+        return words
+    while True:
+        # Numeración de bloques, párrafos y líneas como en image_to_data
+        if iterator.IsAtBeginningOf(RIL.BLOCK):
+            block, par, line = block + 1, 0, 0
+        if iterator.IsAtBeginningOf(RIL.PARA):
+            par, line = par + 1, 0
+        if iterator.IsAtBeginningOf(RIL.TEXTLINE):
+            line += 1
+
+        text = (iterator.GetUTF8Text(RIL.WORD) or "").strip()
+        box = iterator.BoundingBox(RIL.WORD)
+        if text and box:
+            x1, y1, x2, y2 = box
+            words.append({
+                "text": text,
+                "left": x1,
+                "top": y1,
+                "width": x2 - x1,
+                "height": y2 - y1,
+                "line": (block, par, line),
+            })
+        if not iterator.Next(RIL.WORD):
+            break
+    return words
+
+
+def detect_rotation(img: Image.Image) -> Tuple[int, float]:
+    """
+    Detecta la rotación de una página con el OSD de Tesseract.
+
+    Args:
+        img (Image.Image): Imagen a analizar
+
+    Returns:
+        tuple: (grados, confianza). Los grados (0, 90, 180, 270) son los que
+            hay que girar la imagen en sentido horario para enderezarla (el
+            valor "Rotate" del OSD); la confianza es la de la orientación.
+    """
+    if not TESSEROCR_AVAILABLE:
+        # Salida ya interpretada por pytesseract; si falta alguna línea no se gira
+        osd = pytesseract.image_to_osd(_for_pytesseract(img), output_type=pytesseract.Output.DICT)
+        return int(osd.get("rotate", 0)), float(osd.get("orientation_conf", 0.0))
+
+    api = _pool.get("osd", f"--psm {int(tesserocr.PSM.OSD_ONLY)}")
+    api.SetImage(img)
+    osd = api.DetectOrientationScript()
+    if not osd:
+        raise RuntimeError("Tesseract no pudo determinar la orientación")
+    # orient_deg es la rotación horaria detectada; se deshace girando al revés
+    return (360 - osd["orient_deg"]) % 360, float(osd["orient_conf"])
@@ -8,8 +8,14 @@ import logging
 import re
 import os
 import csv
+import sys
+import unicodedata
+from functools import cache
+from pathlib import Path
 from typing import Dict, List, Tuple
 
+import numpy as np
+
 # Configurar logger
 logger = logging.getLogger(__name__)
 
@@ -22,6 +28,10 @@ LEGAL_WORDS_PATH = os.path.join(os.path.dirname(os.path.dirname(
     os.path.dirname(os.path.dirname(__file__)))), 'data', 'legal_words.txt')
 
 
+# Encabezado de corrections.csv (no es una corrección)
+_CORRECTIONS_HEADER = ['ocr', 'correct']
+
+
 def load_corrections() -> Dict[str, str]:
     """
     Carga las correcciones comunes de OCR desde el archivo CSV.
@@ -32,11 +42,11 @@ def load_corrections() -> Dict[str, str]:
     corrections = {}
     try:
         if os.path.exists(CORRECTIONS_PATH):
-            with open(CORRECTIONS_PATH, 'r', encoding='utf-8') as file:
-                reader = csv.reader(file)
-                for row in reader:
-                    if len(row) >= 2:
-                        corrections[row[0]] = row[1]
+            # Lectura de una sola vez; claves y valores internados
+            lines = Path(CORRECTIONS_PATH).read_text(encoding='utf-8').splitlines()
+            for row in csv.reader(lines):
+                if len(row) >= 2 and row[:2] != _CORRECTIONS_HEADER:
+                    corrections[sys.intern(row[0])] = sys.intern(row[1])
             logger.info(f"Cargadas {len(corrections)} correcciones de OCR")
         else:
             logger.warning(
@@ -57,12 +67,12 @@ def load_legal_patterns() -> List[Tuple[str, str]]:
     patterns = []
     try:
         if os.path.exists(LEGAL_PATTERNS_PATH):
-            with open(LEGAL_PATTERNS_PATH, 'r', encoding='utf-8') as file:
-                for line in file:
-                    line = line.strip()
-                    if line and '::' in line:
-                        pattern, replacement = line.split('::', 1)
-                        patterns.append((pattern.strip(), replacement.strip()))
+            text = Path(LEGAL_PATTERNS_PATH).read_text(encoding='utf-8')
+            for line in text.splitlines():
+                line = line.strip()
+                if line and '::' in line:
+                    pattern, replacement = line.split('::', 1)
+                    patterns.append((pattern.strip(), replacement.strip()))
             logger.info(f"Cargados {len(patterns)} patrones legales")
         else:
             logger.warning(
@@ -83,11 +93,9 @@ def load_legal_words() -> List[str]:
     words = []
     try:
         if os.path.exists(LEGAL_WORDS_PATH):
-            with open(LEGAL_WORDS_PATH, 'r', encoding='utf-8') as file:
-                for line in file:
-                    word = line.strip()
-                    if word:
-                        words.append(word)
+            text = Path(LEGAL_WORDS_PATH).read_text(encoding='utf-8')
+            words = [sys.intern(word) for word in map(str.strip, text.splitlines())
+                     if word]
             logger.info(f"Cargadas {len(words)} palabras legales")
         else:
             logger.warning(
@@ -104,6 +112,97 @@ legal_patterns = load_legal_patterns()
 legal_words = load_legal_words()
 
 
+
+def _compile_alternation(words, flags: int = 0):
+    """
+    Compila una alternativa de palabras completas para reemplazarlas en una
+    sola pasada.
+
+    Las palabras más largas van primero para que, en una misma posición,
+    prevalezca la coincidencia más larga.
+
+    Args:
+        words: Palabras a buscar (se escapan)
+        flags (int): Flags de re
+
+    Returns:
+        re.Pattern: Patrón con la palabra en el grupo 1, o None si no hay palabras
+    """
+    words = sorted(words, key=len, reverse=True)
+    if not words:
+        return None
+    return re.compile(r'\b(' + '|'.join(map(re.escape, words)) + r')\b', flags)
+
+
+# Expresiones regulares compiladas una vez al importar el módulo
+_CORRECTIONS_RE = _compile_alternation(corrections_dict)
+_LEGAL_PATTERN_RES = [(re.compile(pattern), replacement)
+                      for pattern, replacement in legal_patterns]
+
+
+def _compile_legal_patterns():
+    """
+    Une los patrones legales en una sola expresión, con un grupo con nombre
+    por patrón para saber cuál ha coincidido.
+
+    Returns:
+        re.Pattern: Patrón combinado, o None si no hay patrones o alguno no
+            puede combinarse (p. ej. flags globales); entonces se aplican uno a uno
+    """
+    if not legal_patterns:
+        return None
+    try:
+        return re.compile('|'.join(f'(?P<g{i}>{pattern})'
+                                   for i, (pattern, _) in enumerate(legal_patterns)))
+    except re.error as e:
+        logger.debug(f"Patrones legales aplicados por separado: {e}")
+        return None
+
+
+def _replace_legal_pattern(match: re.Match) -> str:
+    """Aplica al fragmento coincidente el reemplazo de su patrón legal."""
+    pattern, replacement = _LEGAL_PATTERN_RES[int(match.lastgroup[1:])]
+    # Se vuelve a aplicar el patrón original para resolver sus grupos
+    return pattern.sub(replacement, match.group(0), count=1)
+
+
+_LEGAL_PATTERNS_RE = _compile_legal_patterns()
+
+# Capitalización correcta de cada palabra legal, por su forma en minúsculas
+_LEGAL_CANON = {word.lower(): word for word in legal_words}
+_LEGAL_WORDS_RE = re.compile(
+    r'(?<!\w)(' + '|'.join(map(re.escape, sorted(_LEGAL_CANON, key=len, reverse=True))) + r')(?!\w)',
+    re.IGNORECASE) if _LEGAL_CANON else None
+
+# Caracteres mal reconocidos por OCR y su sustitución
+_CHAR_TRANSLATION = str.maketrans({
+    'ﬁ': 'fi',     # ligaduras
+    'ﬂ': 'fl',
+    'ﬀ': 'ff',
+    '—': '-',      # guiones
+    '–': '-',
+    '‐': '-',
+    '‘': "'",  # comillas
+    '’': "'",
+    '“': '"',
+    '”': '"',
+    '…': '...',    # puntos suspensivos
+    '•': '*',      # viñetas
+    '·': '•',
+})
+
+_SPACE_RE = re.compile(r' +')
+_DECIMAL_RE = re.compile(r'(\d)\.(\d)')
+_SINGLE_NL_RE = re.compile(r'(?<!\n)\n(?!\n)')
+_TRIPLE_NL_RE = re.compile(r'\n{3,}')
+_PARAGRAPH_BREAK_RE = re.compile(r'\n{2,}')
+
+_ART_RE = re.compile(r'(?i)art(?:\.|\s)?(\s*)(\d+)')
+_ARTICULO_RE = re.compile(r'(?i)artículo(\d+)')
+_LEY_RE = re.compile(r'(?i)ley(?:\.|\s)?(\s*)(\d+[\/\.\-][0-9]+)')
+_PARA_RE = re.compile(r'(\d+)\)\.')
+
+
 def apply_corrections(text: str) -> str:
     """
     Aplica correcciones comunes de OCR al texto.
@@ -120,53 +219,146 @@ def apply_corrections(text: str) -> str:
     corrected = text
 
     # Aplicar correcciones específicas de palabras
-    for error, correction in corrections_dict.items():
-        # Usar expresión regular para reemplazar solo palabras completas
-        corrected = re.sub(r'\b' + re.escape(error) +
-                           r'\b', correction, corrected)
+    # Una sola pasada: cada palabra completa se sustituye por su corrección
+    if _CORRECTIONS_RE is not None:
+        corrected = _CORRECTIONS_RE.sub(
+            lambda m: corrections_dict[m.group(1)], corrected)
 
-    # Corregir errores comunes de OCR
+    # Corregir errores comunes de OCR. Cada paso se omite si el texto no
+    # contiene el carácter que lo dispara (búsquedas de subcadena en C, mucho
+    # más baratas que recorrer el texto con una expresión regular)
 
     # Espacios duplicados
-    corrected = re.sub(r' +', ' ', corrected)
-
-    # Caracteres mal reconocidos
-    char_corrections = {
-        'l\\.': 'I.',  # l. -> I.
-        'l,': 'I,',    # l, -> I,
-        'ﬁ': 'fi',     # ligaduras
-        'ﬂ': 'fl',
-        'ﬀ': 'ff',
-        '—': '-',      # guiones
-        '–': '-',
-        '‐': '-',
-        ''': "'",      # comillas
-        ''': "'",
-        '"': '"',
-        '"': '"',
-        '…': '...',    # puntos suspensivos
-        '•': '*',      # viñetas
-        '·': '•',
-        '\\\\': '\\',  # barras
-        '\\|': '|'
-    }
-
-    for error, fix in char_corrections.items():
-        corrected = corrected.replace(error, fix)
+    if '  ' in corrected:
+        corrected = _SPACE_RE.sub(' ', corrected)
+
+    # Caracteres mal reconocidos: las secuencias de varios caracteres se
+    # reemplazan literalmente y los caracteres sueltos en una sola pasada
+    corrected = corrected.replace('l\\.', 'I.').replace('l,', 'I,')
+    if not corrected.isascii():  # Todos los caracteres de la tabla son no ASCII
+        corrected = corrected.translate(_CHAR_TRANSLATION)
+    if '\\' in corrected:
+        corrected = corrected.replace('\\\\', '\\').replace('\\|', '|')
 
     # Corregir problemas con números
     # Cambiar punto decimal por coma
-    corrected = re.sub(r'(\d)\.(\d)', r'\1,\2', corrected)
+    if '.' in corrected:
+        corrected = _DECIMAL_RE.sub(r'\1,\2', corrected)
 
     # Corregir errores de salto de línea
-    # Cambiar saltos de línea únicos por espacios
-    corrected = re.sub(r'(?<!\n)\n(?!\n)', ' ', corrected)
-    # Normalizar múltiples saltos de línea
-    corrected = re.sub(r'\n{3,}', '\n\n', corrected)
+    if '\n' in corrected:
+        # Cambiar saltos de línea únicos por espacios
+        corrected = _SINGLE_NL_RE.sub(' ', corrected)
+        # Normalizar múltiples saltos de línea
+        if '\n\n\n' in corrected:
+            corrected = _TRIPLE_NL_RE.sub('\n\n', corrected)
 
     return corrected
 
 
+# Proporción mínima de letras entre los caracteres visibles de una línea;
+# por debajo se considera ruido del OCR (bordes, manchas, sellos)
+MIN_LINE_ALPHA_RATIO = 0.3
+
+# Tablas de clasificación por punto de código (plano multilingüe básico);
+# los caracteres fuera de él no cuentan como letras ni como espacios
+_BMP_CHARS = [chr(i) for i in range(0x10000)]
+_IS_ALPHA = np.array([c.isalpha() for c in _BMP_CHARS], dtype=np.int32)
+_IS_SPACE = np.array([c.isspace() for c in _BMP_CHARS], dtype=np.int32)
+del _BMP_CHARS
+
+
+def cleanup_text(text: str) -> str:
+    """
+    Elimina las líneas de ruido del texto OCR y normaliza los saltos de línea.
+
+    El texto se normaliza antes a NFC, de modo que las vocales acentuadas que
+    Tesseract entrega descompuestas (letra + tilde combinante) cuenten como
+    una sola letra y coincidan con los patrones. El texto ASCII, el caso más
+    habitual, ya está normalizado y no se recorre.
+
+    Una línea se descarta si menos de MIN_LINE_ALPHA_RATIO de sus caracteres
+    visibles son letras. El recuento se hace para todo el texto a la vez con
+    numpy sobre los puntos de código, en lugar de carácter a carácter.
+
+    Args:
+        text (str): Texto OCR
+
+    Returns:
+        str: Texto limpio
+    """
+    if not text:
+        return text
+
+    if not text.isascii():
+        text = unicodedata.normalize('NFC', text)
+
+    codes = np.frombuffer(text.encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+    codes = np.minimum(codes, 0xFFFF)  # U+FFFF no es letra ni espacio
+
+    # Sumas acumuladas: letras y caracteres visibles de cada línea por diferencia
+    letters = np.concatenate(([0], np.cumsum(_IS_ALPHA[codes])))
+    spaces = np.concatenate(([0], np.cumsum(_IS_SPACE[codes])))
+    newlines = np.flatnonzero(codes == 10)
+    starts = np.concatenate(([0], newlines + 1))
+    ends = np.append(newlines, len(codes))
+
+    line_letters = letters[ends] - letters[starts]
+    visible = (ends - starts) - (spaces[ends] - spaces[starts])
+    # Las líneas en blanco se conservan: separan párrafos
+    keep = (visible == 0) | (line_letters >= MIN_LINE_ALPHA_RATIO * visible)
+
+    lines = text.split('\n')
+    cleaned = '\n'.join(line.rstrip()
+                        for line, kept in zip(lines, keep.tolist()) if kept)
+    return _TRIPLE_NL_RE.sub('\n\n', cleaned).strip()
+
+
+@cache
+def _load_manual_corrections() -> Tuple[re.Pattern, Dict[str, str]]:
+    """
+    Lee una sola vez las correcciones manuales (columnas 'ocr' y 'correct'
+    de corrections.csv) y compila su patrón de búsqueda.
+
+    Returns:
+        tuple: (patrón sin distinguir mayúsculas o None, {error en minúsculas: corrección})
+    """
+    corrections = {}
+    try:
+        with open(CORRECTIONS_PATH, 'r', encoding='utf-8', newline='') as file:
+            for row in csv.DictReader(file):
+                bad, good = row.get('ocr'), row.get('correct')
+                if bad and good is not None:
+                    corrections[bad.lower()] = good
+    except OSError as e:
+        logger.warning(f"No se pudieron cargar las correcciones manuales: {e}")
+
+    return _compile_alternation(corrections, re.IGNORECASE), corrections
+
+
+def apply_manual_corrections(text: str) -> str:
+    """
+    Sustituye las palabras mal reconocidas listadas en corrections.csv,
+    sin distinguir mayúsculas.
+
+    Args:
+        text (str): Texto OCR
+
+    Returns:
+        str: Texto corregido
+    """
+    pattern, corrections = _load_manual_corrections()
+    if not text or pattern is None:
+        return text
+    return pattern.sub(lambda m: corrections[m.group(1).lower()], text)
+
+
+# Finales de línea que indican que la frase continúa en la siguiente
+_CONTINUATION_ENDINGS = (',', ':', ';', '-')
+# Finales de línea que cierran una oración
+_SENTENCE_ENDINGS = ('.', '!', '?')
+
+
 def fix_line_breaks(text: str) -> str:
     """
     Arregla los saltos de línea para mantener párrafos coherentes.
@@ -181,35 +373,29 @@ def fix_line_breaks(text: str) -> str:
         return text
 
     # Preservar saltos de línea dobles (párrafos)
-    text = re.sub(r'\n{2,}', '[PARAGRAPH]', text)
+    text = _PARAGRAPH_BREAK_RE.sub('[PARAGRAPH]', text)
 
     # Juntar líneas rotas dentro del mismo párrafo
     lines = text.split('\n')
-    result = []
+    # Si cada línea va seguida de otra que empieza en minúscula (continuación)
+    next_starts_lowercase = [line[:1].islower() for line in lines[1:]]
+    next_starts_lowercase.append(False)
 
-    for i, line in enumerate(lines):
+    result = []
+    append = result.append
+    for line, next_lower in zip(lines, next_starts_lowercase):
         line = line.strip()
         if not line:
             continue
 
-        # Verificar si la línea termina con un carácter que indica continuación
-        ends_with_continuation = any(line.endswith(c)
-                                     for c in [',', ':', ';', '-'])
-
-        # Verificar si la línea actual no termina con punto
-        no_sentence_end = not line.endswith(
-            '.') and not line.endswith('!') and not line.endswith('?')
-
-        # Verificar si la siguiente línea comienza con minúscula (continuación)
-        next_starts_lowercase = i < len(
-            lines) - 1 and lines[i+1].strip() and lines[i+1][0].islower()
-
-        if ends_with_continuation or (no_sentence_end and next_starts_lowercase):
-            # Es continuación, no añadir salto de línea
-            result.append(line + ' ')
+        # Es continuación si termina en un carácter que la indica, o si no
+        # cierra la oración y la siguiente línea empieza en minúscula
+        if line.endswith(_CONTINUATION_ENDINGS) or (
+                next_lower and not line.endswith(_SENTENCE_ENDINGS)):
+            append(line + ' ')
         else:
             # Es fin de párrafo o oración completa
-            result.append(line + '\n')
+            append(line + '\n')
 
     # Restaurar párrafos
     text = ''.join(result).replace('[PARAGRAPH]', '\n\n')
@@ -236,26 +422,26 @@ def apply_legal_corrections(text: str) -> str:
     corrected = text
 
     # Aplicar patrones de texto legal
-    for pattern, replacement in legal_patterns:
-        corrected = re.sub(pattern, replacement, corrected)
+    if _LEGAL_PATTERNS_RE is not None:
+        corrected = _LEGAL_PATTERNS_RE.sub(_replace_legal_pattern, corrected)
+    else:
+        for pattern, replacement in _LEGAL_PATTERN_RES:
+            corrected = pattern.sub(replacement, corrected)
 
     # Corregir referencias a artículos
-    corrected = re.sub(r'(?i)art(?:\.|\s)?(\s*)(\d+)',
-                       r'Artículo\1\2', corrected)
-    corrected = re.sub(r'(?i)artículo(\d+)', r'Artículo \1', corrected)
+    corrected = _ART_RE.sub(r'Artículo\1\2', corrected)
+    corrected = _ARTICULO_RE.sub(r'Artículo \1', corrected)
 
     # Corregir referencias a leyes
-    corrected = re.sub(
-        r'(?i)ley(?:\.|\s)?(\s*)(\d+[\/\.\-][0-9]+)', r'Ley\1\2', corrected)
+    corrected = _LEY_RE.sub(r'Ley\1\2', corrected)
 
     # Corregir números de párrafos
-    corrected = re.sub(r'(\d+)\)\.', r'\1).', corrected)
+    corrected = _PARA_RE.sub(r'\1).', corrected)
 
     # Asegurar correcta capitalización de palabras legales
-    for word in legal_words:
-        # Solo corregir si la palabra está en minúsculas
-        corrected = re.sub(r'(?<!\w)' + word.lower() +
-                           r'(?!\w)', word, corrected, flags=re.IGNORECASE)
+    if _LEGAL_WORDS_RE is not None:
+        corrected = _LEGAL_WORDS_RE.sub(
+            lambda m: _LEGAL_CANON[m.group(1).lower()], corrected)
 
     return corrected
 
@@ -290,6 +476,24 @@ def clean_and_format_text(text: str, is_legal_doc: bool = False) -> str:
     return clean_text
 
 
+# Caracteres propios del español (acentos, ñ, signos de apertura)
+_SPANISH_CHARS_RE = re.compile(r'[áéíóúüñ¿¡]')
+
+# Palabras de función frecuentes en español
+_SPANISH_MARKERS = ['el', 'la', 'los', 'las', 'un', 'una', 'unos', 'unas',
+                    'y', 'o', 'pero', 'porque', 'como', 'que', 'cuando',
+                    'del', 'al', 'es', 'son', 'está', 'están', 'para', 'por']
+
+# Palabras de función frecuentes en inglés
+_ENGLISH_MARKERS = ['the', 'a', 'an', 'and', 'or', 'but', 'because', 'as',
+                    'that', 'when', 'is', 'are', 'be', 'to', 'for', 'with', 'by']
+
+# Una alternativa por idioma: un solo recorrido del texto encuentra todos
+# los marcadores presentes
+_SPANISH_MARKERS_RE = re.compile(r'\b(?:' + '|'.join(_SPANISH_MARKERS) + r')\b')
+_ENGLISH_MARKERS_RE = re.compile(r'\b(?:' + '|'.join(_ENGLISH_MARKERS) + r')\b')
+
+
 def detect_language(text: str) -> str:
     """
     Detecta el idioma del texto usando patrones sencillos.
@@ -301,25 +505,14 @@ def detect_language(text: str) -> str:
     Returns:
         str: Código de idioma ('spa', 'eng', etc.)
     """
-    # Palabras de función frecuentes en español
-    spanish_markers = ['el', 'la', 'los', 'las', 'un', 'una', 'unos', 'unas',
-                       'y', 'o', 'pero', 'porque', 'como', 'que', 'cuando',
-                       'del', 'al', 'es', 'son', 'está', 'están', 'para', 'por']
-
-    # Palabras de función frecuentes en inglés
-    english_markers = ['the', 'a', 'an', 'and', 'or', 'but', 'because', 'as',
-                       'that', 'when', 'is', 'are', 'be', 'to', 'for', 'with', 'by']
-
-    # Contar ocurrencias
+    # Contar los marcadores distintos presentes
     text_lower = text.lower()
-    spanish_count = sum(1 for word in spanish_markers if re.search(
-        r'\b' + word + r'\b', text_lower))
-    english_count = sum(1 for word in english_markers if re.search(
-        r'\b' + word + r'\b', text_lower))
+    spanish_count = len(set(_SPANISH_MARKERS_RE.findall(text_lower)))
+    english_count = len(set(_ENGLISH_MARKERS_RE.findall(text_lower)))
 
     # Calcular proporciones
-    spanish_ratio = spanish_count / len(spanish_markers)
-    english_ratio = english_count / len(english_markers)
+    spanish_ratio = spanish_count / len(_SPANISH_MARKERS)
+    english_ratio = english_count / len(_ENGLISH_MARKERS)
 
     # Determinar idioma basado en la mayor proporción
     if spanish_ratio > english_ratio:
@@ -328,12 +521,24 @@ def detect_language(text: str) -> str:
         return 'eng'
     else:
         # Si no hay clara preferencia, revisar acentos y caracteres especiales
-        if re.search(r'[áéíóúüñ¿¡]', text):
+        if _SPANISH_CHARS_RE.search(text):
             return 'spa'
         else:
             return 'eng'
 
 
+# Patrones de título común, unidos en una sola alternativa: cada párrafo
+# se prueba con un único match
+_TITLE_RE = re.compile('|'.join((
+    r'^#+\s+.+$',  # Títulos markdown
+    r'^[A-Z][A-Z\s]+:',  # TÍTULO EN MAYÚSCULAS:
+    r'^[IVX]+\.\s+.+$',  # Números romanos
+    r'^\d+\.\s+[A-Z]',  # Números seguidos de texto
+    r'^CAPÍTULO\s+[IVXLCDM]+',  # Capítulos
+    r'^Artículo\s+\d+',  # Artículos
+)), re.MULTILINE)
+
+
 def split_into_sections(text: str) -> List[str]:
     """
     Divide el texto en secciones lógicas basadas en títulos y subtítulos.
@@ -344,40 +549,102 @@ def split_into_sections(text: str) -> List[str]:
     Returns:
         List[str]: Lista de secciones
     """
-    # Patrones de título común
-    title_patterns = [
-        r'^#+\s+.+$',  # Títulos markdown
-        r'^[A-Z][A-Z\s]+:',  # TÍTULO EN MAYÚSCULAS:
-        r'^[IVX]+\.\s+.+$',  # Números romanos
-        r'^\d+\.\s+[A-Z]',  # Números seguidos de texto
-        r'^CAPÍTULO\s+[IVXLCDM]+',  # Capítulos
-        r'^Artículo\s+\d+',  # Artículos
-    ]
+    # Dividir por párrafos
+    paragraphs = _PARAGRAPH_BREAK_RE.split(text)
 
-    # Compilar patrones
-    compiled_patterns = [re.compile(pattern, re.MULTILINE)
-                         for pattern in title_patterns]
+    # Cada título (salvo el primer párrafo) abre una sección nueva: basta con
+    # localizar esos cortes en un recorrido y unir cada tramo una sola vez
+    starts = [0]
+    starts.extend(i for i in range(1, len(paragraphs))
+                  if _TITLE_RE.match(paragraphs[i].strip()))
+    starts.append(len(paragraphs))
 
-    # Dividir por párrafos
-    paragraphs = re.split(r'\n{2,}', text)
+    sections = ['\n\n'.join(paragraphs[start:end])
+                for start, end in zip(starts, starts[1:])]
 
-    sections = []
-    current_section = []
+    return sections
 
-    for paragraph in paragraphs:
-        # Verificar si el párrafo coincide con algún patrón de título
-        is_title = any(pattern.match(paragraph.strip())
-                       for pattern in compiled_patterns)
 
-        # Si es un título y ya tenemos contenido, comenzar nueva sección
-        if is_title and current_section:
-            sections.append('\n\n'.join(current_section))
-            current_section = [paragraph]
-        else:
-            current_section.append(paragraph)
+# Patrones estructurales anclados al inicio de línea (compilados una vez)
+_HEADING_RE = re.compile(r'^[A-ZÁÉÍÓÚÑ\s]{10,}$')
+_SECTION_RE = re.compile(r'^\d+\.\s+[A-ZÁÉÍÓÚÑ][^.]+$')
+_LIST_RE = re.compile(r'^[\-\*•]\s+')
 
-    # Añadir la última sección
-    if current_section:
-        sections.append('\n\n'.join(current_section))
+# Longitud máxima de una línea numerada para tratarla como título de sección
+_SECTION_MAX_LENGTH = 80
 
-    return sections
+
+def _classify_line(line: str) -> str:
+    """
+    Clasifica una línea según su estructura.
+
+    Cada patrón solo se evalúa si el primer carácter de la línea es
+    compatible con él, de modo que la mayoría de líneas se descartan
+    sin ejecutar ninguna expresión regular.
+
+    Args:
+        line (str): Línea sin espacios iniciales ni finales
+
+    Returns:
+        str: 'list', 'section', 'heading' o '' si no tiene estructura
+    """
+    c = line[:1]
+    if not c:
+        return ''
+    if c in '-*•':
+        return 'list' if _LIST_RE.match(line) else ''
+    if c.isdigit():
+        if len(line) <= _SECTION_MAX_LENGTH and _SECTION_RE.match(line):
+            return 'section'
+        return ''
+    if c.isupper() and _HEADING_RE.match(line):
+        return 'heading'
+    return ''
+
+
+def detect_lists(text: str) -> str:
+    """
+    Normaliza las viñetas de listas al formato Markdown ('- elemento').
+
+    Args:
+        text (str): Texto OCR
+
+    Returns:
+        str: Texto con las listas formateadas
+    """
+    if not text:
+        return text
+
+    lines = text.splitlines()
+    for i, line in enumerate(lines):
+        stripped = line.strip()
+        if _classify_line(stripped) == 'list':
+            lines[i] = '- ' + _LIST_RE.sub('', stripped, count=1)
+
+    return '\n'.join(lines)
+
+
+def detect_structured_headings(text: str) -> str:
+    """
+    Convierte en encabezados Markdown las líneas en mayúsculas y los
+    títulos de sección numerados ('1. DISPOSICIONES GENERALES').
+
+    Args:
+        text (str): Texto OCR
+
+    Returns:
+        str: Texto con los encabezados formateados
+    """
+    if not text:
+        return text
+
+    lines = text.splitlines()
+    for i, line in enumerate(lines):
+        stripped = line.strip()
+        kind = _classify_line(stripped)
+        if kind == 'heading':
+            lines[i] = '## ' + stripped
+        elif kind == 'section':
+            lines[i] = '### ' + stripped
+
+    return '\n'.join(lines)
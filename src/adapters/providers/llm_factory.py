@@ -9,11 +9,9 @@ from adapters.providers.gemini_provider import GeminiProvider
 from adapters.providers.openai_provider import OpenAIProvider
 from typing import Dict, Any, Optional, Type
 from domain.ports.llm_provider import LLMProvider
-from shared.util.config import AppConfig
+from shared.util.config import config as app_config
 from infrastructure.logging_setup import logger
 
-# Instancia de configuración
-app_config = AppConfig()
 
 # Importaciones adelantadas para mejorar rendimiento
 
@@ -21,6 +19,9 @@ app_config = AppConfig()
 class LLMProviderFactory:
     """Fábrica para crear instancias de proveedores LLM."""
 
+    # Solo métodos de clase: las instancias no necesitan atributos propios
+    __slots__ = ()
+
     # Registro de proveedores disponibles
     _providers = {
         "openai": OpenAIProvider,
@@ -43,53 +44,34 @@ class LLMProviderFactory:
             Una instancia de LLMProvider inicializada o None si falla.
         """
         try:
-            # Verificar si ya existe en caché
-            if provider_type and provider_type in cls._provider_cache:
-                logger.debug(f"Usando proveedor {provider_type} desde caché")
-                return cls._provider_cache[provider_type]
-
-            # Cargar configuración
-            api_config = {
-                "openai": {
-                    "api_key": app_config.openai.api_key,
-                    "org_id": app_config.openai.org_id,
-                    "model": app_config.openai.model,
-                    "max_retries": app_config.openai.max_retries
-                },
-                "gemini": {
-                    "api_key": app_config.gemini.api_key,
-                    "model": app_config.gemini.model,
-                    "max_retries": app_config.gemini.max_retries
-                }
-            }
-
             # Determinar proveedor automáticamente si no se especifica
             if not provider_type:
-                if "openai" in api_config and api_config["openai"].get("api_key"):
-                    provider_type = "openai"
-                elif "gemini" in api_config and api_config["gemini"].get("api_key"):
-                    provider_type = "gemini"
-                else:
+                provider_type = cls._detect_provider_type()
+                if provider_type is None:
                     logger.warning(
                         "No se encontró ninguna configuración de API válida")
                     return None
 
+            # Verificar si ya existe en caché antes de leer la configuración
+            provider = cls._provider_cache.get(provider_type)
+            if provider is not None:
+                logger.debug(f"Usando proveedor {provider_type} desde caché")
+                return provider
+
             # Crear e inicializar el proveedor apropiado
             if provider_type in cls._providers:
-                provider_class = cls._providers[provider_type]
-                provider = provider_class()
-
-                # Inicializar con la configuración correspondiente
-                if provider_type in api_config:
-                    provider.initialize(api_config[provider_type])
-
-                    # Guardar en caché
-                    cls._provider_cache[provider_type] = provider
-                    return provider
-                else:
+                provider_config = cls._provider_config(provider_type)
+                if provider_config is None:
                     logger.error(
                         f"Configuración no encontrada para {provider_type}")
                     return None
+
+                provider = cls._providers[provider_type]()
+                provider.initialize(provider_config)
+
+                # Guardar en caché
+                cls._provider_cache[provider_type] = provider
+                return provider
             else:
                 logger.error(f"Tipo de proveedor desconocido: {provider_type}")
                 return None
@@ -98,6 +80,50 @@ class LLMProviderFactory:
             logger.error(f"Error al crear proveedor LLM: {e}")
             return None
 
+    @staticmethod
+    def _detect_provider_type() -> Optional[str]:
+        """
+        Elige el proveedor según las claves de API configuradas (OpenAI
+        tiene prioridad sobre Gemini).
+
+        Returns:
+            Nombre del proveedor o None si no hay ninguna clave
+        """
+        if app_config.openai.api_key:
+            return "openai"
+        if app_config.gemini.api_key:
+            return "gemini"
+        return None
+
+    @staticmethod
+    def _provider_config(provider_type: str) -> Optional[Dict[str, Any]]:
+        """
+        Construye la configuración de un proveedor a partir de app_config.
+
+        Solo se llama al crear un proveedor que no está en caché, y solo lee
+        la sección de ese proveedor.
+
+        Args:
+            provider_type: Tipo de proveedor
+
+        Returns:
+            Diccionario de configuración o None si el proveedor no la tiene
+        """
+        if provider_type == "openai":
+            return {
+                "api_key": app_config.openai.api_key,
+                "org_id": app_config.openai.org_id,
+                "model": app_config.openai.model,
+                "max_retries": app_config.openai.max_retries
+            }
+        if provider_type == "gemini":
+            return {
+                "api_key": app_config.gemini.api_key,
+                "model": app_config.gemini.model,
+                "max_retries": app_config.gemini.max_retries
+            }
+        return None
+
     @classmethod
     def register_provider(cls, name: str, provider_class: Type[LLMProvider]) -> None:
         """
@@ -35,8 +35,13 @@ from shared.utils.error_handling import ConfigurationError, ErrorContext
 class DependencyContainer:
     """Contenedor de dependencias para inyección."""
 
+    __slots__ = ('_document_port', '_storage_port', '_llm_port',
+                 '_configuration_service')
+
     def __init__(self):
-        self._instances: Dict[str, Any] = {}
+        self._document_port: Optional[DocumentPort] = None
+        self._storage_port: Optional[StoragePort] = None
+        self._llm_port: Optional[LLMPort] = None
         self._configuration_service: Optional[ConfigurationService] = None
 
         # Asegurar que los directorios existan
@@ -51,19 +56,19 @@ class DependencyContainer:
 
     def get_document_port(self) -> DocumentPort:
         """Obtiene una instancia del puerto de documentos."""
-        if 'document_port' not in self._instances:
-            self._instances['document_port'] = DocumentAdapter()
-        return self._instances['document_port']
+        if self._document_port is None:
+            self._document_port = DocumentAdapter()
+        return self._document_port
 
     def get_storage_port(self) -> StoragePort:
         """Obtiene una instancia del puerto de almacenamiento."""
-        if 'storage_port' not in self._instances:
-            self._instances['storage_port'] = StorageAdapter()
-        return self._instances['storage_port']
+        if self._storage_port is None:
+            self._storage_port = StorageAdapter()
+        return self._storage_port
 
     def get_llm_port(self) -> LLMPort:
         """Obtiene una instancia del puerto LLM."""
-        if 'llm_port' not in self._instances:
+        if self._llm_port is None:
             try:
                 # Configurar el refinador LLM basado en la configuración actual
                 llm_config = self.configuration_service.get_llm_configuration()
@@ -71,13 +76,13 @@ class DependencyContainer:
                 if llm_config['is_enabled'] and llm_config['provider']:
                     provider_config = config.get_llm_provider_config(
                         llm_config['provider'])
-                    self._instances['llm_port'] = LLMRefiner(
+                    self._llm_port = LLMRefiner(
                         provider=llm_config['provider'],
                         config=provider_config
                     )
                 else:
                     # Crear un adaptador LLM deshabilitado
-                    self._instances['llm_port'] = LLMRefiner(
+                    self._llm_port = LLMRefiner(
                         provider=None,
                         config={}
                     )
@@ -94,11 +99,13 @@ class DependencyContainer:
                     e
                 )
 
-        return self._instances['llm_port']
+        return self._llm_port
 
     def reset(self) -> None:
         """Reinicia todas las instancias (útil para pruebas)."""
-        self._instances = {}
+        self._document_port = None
+        self._storage_port = None
+        self._llm_port = None
         self._configuration_service = None
 
 
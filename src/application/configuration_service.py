@@ -4,22 +4,66 @@ Servicio de gestión de configuración.
 Este servicio centraliza toda la lógica de configuración y manejo de estado,
 eliminando la duplicación entre múltiples módulos de configuración.
 """
+import copy
 import json
 import os
+import stat
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from dataclasses import asdict
 
 from shared.util.config import config, AppConfig
 from shared.constants.directories import Directories
 from shared.utils.error_handling import ConfigurationError, ErrorContext
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+
+    def _json_dumps(data: Dict[str, Any]) -> bytes:
+        return orjson.dumps(
+            data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+except ImportError:
+    def _json_loads(data: bytes):
+        return json.loads(data.decode("utf-8"))
+
+    def _json_dumps(data: Dict[str, Any]) -> bytes:
+        return json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+# Secciones de configuración ya convertidas a diccionario, por identidad
+_section_snapshots: Dict[int, Tuple[Any, Dict[str, Any]]] = {}
+
+
+def _section_as_dict(section: Any) -> Dict[str, Any]:
+    """
+    Convierte una sección de configuración (dataclass congelada) a diccionario.
+
+    La conversión se hace una sola vez por instancia de la sección; si la
+    sección se sustituye por otra, se vuelve a convertir.
+
+    Args:
+        section: Sección de configuración, p. ej. config.ocr
+
+    Returns:
+        Dict[str, Any]: Copia independiente de la sección
+    """
+    cached = _section_snapshots.get(id(section))
+    if cached is None or cached[0] is not section:
+        # Se guarda la propia sección para que su id no pueda reutilizarse
+        cached = _section_snapshots[id(section)] = (section, asdict(section))
+    # Copia profunda: las listas (p. ej. cors_origins) no se comparten
+    return copy.deepcopy(cached[1])
+
 
 class ConfigurationService:
     """Servicio para gestionar la configuración de la aplicación."""
 
     def __init__(self):
         self._config_file = Directories.DATA / "app_config.json"
+        # Última configuración leída, con la fecha de modificación y el
+        # tamaño del archivo en ese momento
+        self._cache: Optional[Tuple[Tuple[int, int], Dict[str, Any]]] = None
         self._ensure_config_directory()
 
     def _ensure_config_directory(self) -> None:
@@ -37,8 +81,9 @@ class ConfigurationService:
             ConfigurationError: Si hay un error al guardar la configuración
         """
         try:
-            with open(self._config_file, 'w', encoding='utf-8') as f:
-                json.dump(config_data, f, indent=2, ensure_ascii=False)
+            self._cache = None
+            with open(self._config_file, 'wb') as f:
+                f.write(_json_dumps(config_data))
         except Exception as e:
             context = ErrorContext(
                 operation="save_configuration",
@@ -54,6 +99,10 @@ class ConfigurationService:
         """
         Carga la configuración desde el archivo JSON.
 
+        El archivo solo se vuelve a leer si ha cambiado desde la última
+        lectura; cada llamada devuelve una copia, que puede modificarse sin
+        afectar a la configuración cacheada.
+
         Returns:
             Dict[str, Any]: Datos de configuración cargados
 
@@ -61,11 +110,16 @@ class ConfigurationService:
             ConfigurationError: Si hay un error al cargar la configuración
         """
         try:
-            if not self._config_file.exists():
+            try:
+                st = self._config_file.stat()
+            except FileNotFoundError:
                 return {}
+            version = (st.st_mtime_ns, st.st_size)
 
-            with open(self._config_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            if self._cache is None or self._cache[0] != version:
+                with open(self._config_file, 'rb') as f:
+                    self._cache = (version, _json_loads(f.read()))
+            return copy.deepcopy(self._cache[1])
         except Exception as e:
             context = ErrorContext(
                 operation="load_configuration",
@@ -133,7 +187,7 @@ class ConfigurationService:
         Returns:
             Dict[str, Any]: Configuración de OCR
         """
-        return asdict(config.ocr)
+        return _section_as_dict(config.ocr)
 
     def get_api_configuration(self) -> Dict[str, Any]:
         """
@@ -142,7 +196,7 @@ class ConfigurationService:
         Returns:
             Dict[str, Any]: Configuración de la API
         """
-        return asdict(config.api)
+        return _section_as_dict(config.api)
 
     def validate_current_configuration(self) -> Dict[str, Any]:
         """
@@ -175,10 +229,16 @@ class ConfigurationService:
         """
         directories_status = {}
         for name, path in Directories.get_all_paths().items():
+            # Un único stat por ruta responde a existencia y tipo
+            try:
+                is_dir = stat.S_ISDIR(os.stat(path).st_mode)
+                exists = True
+            except OSError:
+                exists = is_dir = False
             directories_status[name] = {
-                'exists': path.exists(),
-                'is_directory': path.is_dir() if path.exists() else False,
-                'writable': path.is_dir() and os.access(path, os.W_OK) if path.exists() else False,
+                'exists': exists,
+                'is_directory': is_dir,
+                'writable': is_dir and os.access(path, os.W_OK),
                 'path': str(path)
             }
 
@@ -10,6 +10,7 @@ sin exponer detalles de implementación al dominio.
 from .file_storage import save_markdown, log_api_interaction
 from .logging_setup import logger, log_execution_time, get_logger_for_module
 from .ocr_cache import OCRCache, ocr_cache
+from .llm_cache import LLMResponseCache, get_llm_cache
 from .storage_adapter import StorageAdapter
 
 __all__ = [
@@ -26,4 +27,8 @@ __all__ = [
     # Caché OCR
     'OCRCache',
     'ocr_cache',
+
+    # Caché LLM
+    'LLMResponseCache',
+    'get_llm_cache',
 ]
@@ -5,6 +5,7 @@ Implementa DocumentPort usando PyMuPDF para operaciones básicas de documentos.
 from pathlib import Path
 from typing import List, Tuple, Dict, Any
 import fitz
+from PIL import Image
 from domain.ports.document_port import DocumentPort
 from infrastructure.logging_setup import logger
 
@@ -66,11 +67,14 @@ class DocumentAdapter(DocumentPort):
             doc = fitz.open(pdf_path)
             tables = []
 
+            from adapters.document_processing import (
+                detect_table_regions, ocr_tables_to_markdown, render_page)
+
             for page_num in range(len(doc)):
-                page = doc[page_num]
-                # Usar la función existente de extracción de tablas
-                from adapters.document_processing import extract_tables_from_page
-                page_tables = extract_tables_from_page(page)
+                # Detectar las tablas en la página rasterizada y reconocerlas
+                # todas con una sola llamada a Tesseract
+                img = Image.fromarray(render_page(doc[page_num]))
+                page_tables = ocr_tables_to_markdown(img, detect_table_regions(img))
 
                 for table in page_tables:
                     tables.append((page_num + 1, table))
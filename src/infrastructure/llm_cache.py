@@ -0,0 +1,169 @@
+"""
+Sistema de caché para respuestas de LLM.
+
+Este módulo evita reenviar al proveedor LLM peticiones idénticas a otras
+ya resueltas. Es habitual en documentos con texto repetido entre páginas
+(encabezados, pies de página, avisos legales), donde cada repetición
+costaría una llamada completa a la API.
+"""
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+from loguru import logger
+from shared.constants.directories import Directories
+
+# Ruta de la base de datos SQLite para caché persistente
+CACHE_DB_PATH = Directories.CACHE / "llm_cache.db"
+
+
+class LLMResponseCache:
+    """
+    Caché de respuestas LLM por coincidencia exacta de la petición.
+
+    Combina una caché LRU en memoria con almacenamiento persistente en
+    SQLite para reutilizar respuestas entre sesiones.
+    """
+
+    def __init__(self, db_path: Path = CACHE_DB_PATH, memory_size: int = 256):
+        """
+        Inicializa la caché y asegura que exista la base de datos.
+
+        Args:
+            db_path: Ruta de la base de datos SQLite
+            memory_size: Número máximo de respuestas en memoria
+        """
+        self.db_path = db_path
+        self.memory_size = memory_size
+        self._memory: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+        self._ensure_db_exists()
+
+    def _ensure_db_exists(self):
+        """Crea la base de datos y tabla si no existen."""
+        try:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path))
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS llm_responses (
+                    request_hash TEXT PRIMARY KEY,
+                    response TEXT,
+                    timestamp TEXT
+                )
+            ''')
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            logger.error(f"Error inicializando caché LLM: {str(e)}")
+
+    @staticmethod
+    def make_key(system_prompt: str, prompt: str, namespace: str = "") -> str:
+        """
+        Genera la clave de caché de una petición.
+
+        Args:
+            system_prompt: Prompt de sistema
+            prompt: Prompt de usuario
+            namespace: Identificador del proveedor/modelo
+
+        Returns:
+            str: Hash BLAKE2b hexadecimal de la petición
+        """
+        payload = "\x00".join((namespace, system_prompt, prompt))
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=32).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Obtiene una respuesta cacheada.
+
+        Args:
+            key: Clave generada con make_key
+
+        Returns:
+            str o None: Respuesta cacheada, None si no existe
+        """
+        with self._lock:
+            response = self._memory.get(key)
+            if response is not None:
+                self._memory.move_to_end(key)
+                return response
+
+        try:
+            conn = sqlite3.connect(str(self.db_path))
+            row = conn.execute(
+                "SELECT response FROM llm_responses WHERE request_hash = ?",
+                (key,)).fetchone()
+            conn.close()
+        except Exception as e:
+            logger.error(f"Error al recuperar respuesta de caché LLM: {str(e)}")
+            return None
+
+        if row is None:
+            return None
+
+        self._remember(key, row[0])
+        return row[0]
+
+    def set(self, key: str, response: str) -> None:
+        """
+        Guarda una respuesta en la caché.
+
+        Args:
+            key: Clave generada con make_key
+            response: Respuesta del proveedor LLM
+        """
+        self._remember(key, response)
+        try:
+            conn = sqlite3.connect(str(self.db_path))
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_responses VALUES (?, ?, ?)",
+                (key, response, datetime.now().isoformat()))
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            logger.error(f"Error al guardar respuesta en caché LLM: {str(e)}")
+
+    def _remember(self, key: str, response: str) -> None:
+        """Guarda una respuesta en la caché en memoria."""
+        with self._lock:
+            self._memory[key] = response
+            self._memory.move_to_end(key)
+            if len(self._memory) > self.memory_size:
+                self._memory.popitem(last=False)
+
+    def clear_cache(self, memory_only: bool = False) -> None:
+        """
+        Limpia la caché de respuestas.
+
+        Args:
+            memory_only: Si es True, solo limpia la caché en memoria
+        """
+        with self._lock:
+            self._memory.clear()
+
+        if not memory_only:
+            try:
+                conn = sqlite3.connect(str(self.db_path))
+                conn.execute("DELETE FROM llm_responses")
+                conn.commit()
+                conn.close()
+                logger.info("Caché LLM persistente eliminada completamente")
+            except Exception as e:
+                logger.error(
+                    f"Error al limpiar caché LLM persistente: {str(e)}")
+
+
+@lru_cache(maxsize=1)
+def get_llm_cache() -> LLMResponseCache:
+    """
+    Devuelve la caché de respuestas LLM compartida por toda la aplicación.
+
+    Se crea en el primer uso, de modo que importar el módulo no crea la
+    base de datos SQLite si nunca se llega a refinar con un LLM.
+    """
+    return LLMResponseCache()
@@ -9,10 +9,8 @@ import logging
 from pathlib import Path
 from typing import Dict, Any, Optional, List
 from domain.ports.storage_port import StoragePort
-from shared.util.config import AppConfig
+from shared.util.config import config as app_config
 
-# Instancia de configuración
-app_config = AppConfig()
 
 logger = logging.getLogger(__name__)
 
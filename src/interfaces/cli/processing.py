@@ -6,7 +6,7 @@ import time
 from pathlib import Path
 
 # Importaciones de la aplicación
-from application.composition_root import DependencyContainer, composition_root
+from application.composition_root import composition_root, container
 
 # Importaciones de infraestructura
 from infrastructure.logging_setup import logger
@@ -14,9 +14,6 @@ from infrastructure.logging_setup import logger
 # Importaciones locales
 from .utils import show_progress, print_success_summary, print_error_details
 
-# Crear contenedor de dependencias
-container = DependencyContainer()
-
 
 def convert_pdf(pdf_path: Path) -> None:
     """
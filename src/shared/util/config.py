@@ -22,6 +22,8 @@ class OCRConfig:
     psm: int = int(os.getenv('OCR_PSM', '3'))
     oem: int = int(os.getenv('OCR_OEM', '3'))
     timeout: int = int(os.getenv('OCR_TIMEOUT', '60'))
+    # Número máximo de páginas procesadas en paralelo (0 = automático)
+    concurrency: int = int(os.getenv('OCR_CONCURRENCY', '0'))
 
 
 @dataclass(frozen=True)
@@ -32,6 +34,8 @@ class LLMConfig:
     temperature: float = float(os.getenv('LLM_TEMPERATURE', '0.1'))
     max_tokens: int = int(os.getenv('LLM_MAX_TOKENS', '500'))
     timeout: int = int(os.getenv('LLM_TIMEOUT', '30'))
+    # Peticiones simultáneas al proveedor al refinar varias páginas
+    concurrency: int = int(os.getenv('LLM_CONCURRENCY', '4'))
 
 
 @dataclass(frozen=True)
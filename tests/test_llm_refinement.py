@@ -0,0 +1,101 @@
+"""
+Pruebas del refinamiento LLM ante fallos del proveedor.
+
+El refinamiento es opcional: si el proveedor falla o no responde, el texto
+de la página debe llegar intacto al resultado.
+"""
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from adapters import llm_services  # noqa: E402
+from adapters.ocr import ocr_engine  # noqa: E402
+from infrastructure.llm_cache import LLMResponseCache  # noqa: E402
+
+PAGE_TEXT = "Contrato de concesión 2025, artículo 15 del reglamento."
+
+
+class FailingProvider:
+    """Proveedor que falla en todas las peticiones."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def generate_completion(self, prompt, system_prompt=None, temperature=0.1):
+        self.calls += 1
+        raise RuntimeError("proveedor no disponible")
+
+
+class EmptyProvider:
+    """Proveedor que responde sin contenido."""
+
+    def generate_completion(self, prompt, system_prompt=None, temperature=0.1):
+        return "   "
+
+
+class EchoProvider:
+    """Proveedor que devuelve el prompt recibido."""
+
+    def generate_completion(self, prompt, system_prompt=None, temperature=0.1):
+        return prompt
+
+
+class LLMRefinementFailureTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        cache = LLMResponseCache(Path(tmp_dir.name) / "llm_cache.db")
+        patcher = mock.patch.object(llm_services, "get_llm_cache",
+                                    return_value=cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.refiner = llm_services.LLMRefiner()
+        self.refiner.retry_delay = 0
+
+    def test_refine_returns_original_text_when_provider_raises(self):
+        provider = FailingProvider()
+        self.refiner.provider = provider
+
+        self.assertEqual(self.refiner.refine(PAGE_TEXT), PAGE_TEXT)
+        self.assertEqual(provider.calls, self.refiner.max_retries + 1)
+
+    def test_refine_returns_original_text_on_empty_response(self):
+        self.refiner.provider = EmptyProvider()
+
+        self.assertEqual(self.refiner.refine(PAGE_TEXT), PAGE_TEXT)
+
+    def test_large_text_is_kept_intact_when_provider_raises(self):
+        self.refiner.provider = FailingProvider()
+        text = "\n\n".join([PAGE_TEXT * 5] * 4)
+
+        self.assertEqual(self.refiner.refine(text, max_chunk_size=300), text)
+
+    def test_refine_page_text_keeps_ocr_text_when_provider_raises(self):
+        self.refiner.provider = FailingProvider()
+
+        with mock.patch.object(ocr_engine, "get_llm_refiner",
+                               return_value=self.refiner), \
+                mock.patch.object(llm_services.LLMRefiner, "is_enabled",
+                                  return_value=True):
+            self.assertEqual(ocr_engine.refine_page_text(PAGE_TEXT), PAGE_TEXT)
+            self.assertEqual(ocr_engine.refine_pages_text([PAGE_TEXT, PAGE_TEXT]),
+                             [PAGE_TEXT, PAGE_TEXT])
+
+    def test_digital_text_is_sent_without_ocr_corrections(self):
+        self.refiner.provider = EchoProvider()
+
+        refined = self.refiner.refine_batch([PAGE_TEXT, PAGE_TEXT],
+                                            from_ocr=[False, True])
+
+        self.assertEqual(refined[0], PAGE_TEXT)
+        self.assertNotEqual(refined[1], PAGE_TEXT)
+
+
+if __name__ == "__main__":
+    unittest.main()